@@ -0,0 +1,218 @@
+"""
+Measure the throughput of loading a synthetic fixtures tree (users,
+categories, tags, and articles with foreign keys and many-to-many tags) into
+SQLite, with both the SQLAlchemy and Django factories.
+
+Each combination of factory and size is run in a fresh subprocess, so that
+the peak RSS reported is that of the run itself. The rows/sec numbers are
+for rendering and parsing the files (``FixturesLoader._load_data``), and for
+writing the rows to the database (the rest of ``create_all``).
+
+Usage::
+
+    python benchmarks/bench_loading.py [--sizes 1000,10000,100000]
+                                       [--factories sqlalchemy,django]
+                                       [--bulk] [--output results.json]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+FACTORIES = ['sqlalchemy', 'django']
+SIZES = [1000, 10000, 100000]
+
+
+def generate_fixtures(fixtures_dir: str, rows: int):
+    """
+    Write a fixtures tree with (about) the given total number of rows.
+    """
+    users = max(1, rows // 10)
+    categories = max(1, rows // 100)
+    tags = max(2, rows // 50)
+    articles = max(1, rows - users - categories - tags)
+
+    def write(class_name, count, row):
+        with open(os.path.join(fixtures_dir, class_name + '.yml'), 'w') as f:
+            f.writelines(row(i) for i in range(count))
+
+    write('User', users, lambda i: (
+        'u{i}:\n'
+        '  username: user{i}\n'
+        '  email: user{i}@example.com\n'
+        '  password: password\n'
+        '  first_name: First{i}\n'
+        '  last_name: Last{i}\n').format(i=i))
+    write('Category', categories, lambda i: (
+        'c{i}:\n'
+        '  name: Category {i}\n').format(i=i))
+    write('Tag', tags, lambda i: (
+        't{i}:\n'
+        '  name: Tag {i}\n').format(i=i))
+    write('Article', articles, lambda i: (
+        'a{i}:\n'
+        '  title: Article {i}\n'
+        '  author: User(u{user})\n'
+        '  category: Category(c{category})\n'
+        '  tags: Tag(t{tag1}, t{tag2})\n').format(
+            i=i, user=i % users, category=i % categories,
+            tag1=i % tags, tag2=(i * 7 + 1) % tags))
+    return users + categories + tags + articles
+
+
+def sqlalchemy_factory(db_path: str, bulk: bool):
+    import sqlalchemy as sa
+
+    from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+    from py_yaml_fixtures.factories.sqlalchemy import SQLAlchemyModelFactory
+
+    BaseModel = declarative_base()
+
+    article_tags = sa.Table(
+        'article_tags', BaseModel.metadata,
+        sa.Column('article_id', sa.Integer, sa.ForeignKey('article.id'), primary_key=True),
+        sa.Column('tag_id', sa.Integer, sa.ForeignKey('tag.id'), primary_key=True),
+    )
+
+    class User(BaseModel):
+        __tablename__ = 'user'
+        id = sa.Column(sa.Integer, primary_key=True)
+        username = sa.Column(sa.String(150), unique=True)
+        email = sa.Column(sa.String(254))
+        password = sa.Column(sa.String(128))
+        first_name = sa.Column(sa.String(150))
+        last_name = sa.Column(sa.String(150))
+
+    class Category(BaseModel):
+        __tablename__ = 'category'
+        id = sa.Column(sa.Integer, primary_key=True)
+        name = sa.Column(sa.String(64))
+
+    class Tag(BaseModel):
+        __tablename__ = 'tag'
+        id = sa.Column(sa.Integer, primary_key=True)
+        name = sa.Column(sa.String(64))
+
+    class Article(BaseModel):
+        __tablename__ = 'article'
+        id = sa.Column(sa.Integer, primary_key=True)
+        title = sa.Column(sa.String(100))
+        author_id = sa.Column(sa.Integer, sa.ForeignKey('user.id'), nullable=False)
+        author = relationship('User')
+        category_id = sa.Column(sa.Integer, sa.ForeignKey('category.id'))
+        category = relationship('Category')
+        tags = relationship('Tag', secondary=article_tags)
+
+    engine = sa.create_engine('sqlite:///' + db_path)
+    BaseModel.metadata.create_all(bind=engine)
+    return SQLAlchemyModelFactory(sessionmaker(bind=engine)(),
+                                  [User, Category, Tag, Article], bulk=bulk)
+
+
+def django_factory(db_path: str, bulk: bool):
+    import django
+
+    from django.conf import settings
+    from django.core.management import call_command
+
+    settings.configure(
+        INSTALLED_APPS=['django.contrib.auth',
+                        'django.contrib.contenttypes',
+                        'django_test_app'],
+        AUTH_USER_MODEL='django_test_app.User',
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3',
+                               'NAME': db_path}},
+        USE_TZ=True,
+    )
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+    from django_test_app.models import Article, Category, Tag, User
+    from py_yaml_fixtures.factories.django import DjangoModelFactory
+    return DjangoModelFactory([User, Category, Tag, Article], bulk=bulk)
+
+
+def run(factory_name: str, size: int, bulk: bool) -> dict:
+    """
+    Run a single benchmark (in the current process).
+    """
+    from py_yaml_fixtures import FixturesLoader
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixtures_dir = os.path.join(tmp_dir, 'fixtures')
+        os.mkdir(fixtures_dir)
+        rows = generate_fixtures(fixtures_dir, size)
+
+        make_factory = sqlalchemy_factory if factory_name == 'sqlalchemy' else django_factory
+        factory = make_factory(os.path.join(tmp_dir, 'db.sqlite'), bulk)
+        loader = FixturesLoader(factory, fixture_dirs=[fixtures_dir])
+
+        start = time.perf_counter()
+        loader._load_data()
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loader.create_all()
+        create_time = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss_mb = max_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+    return {
+        'factory': factory_name,
+        'bulk': bulk,
+        'rows': rows,
+        'load_time': load_time,
+        'load_rows_per_sec': rows / load_time,
+        'create_time': create_time,
+        'create_rows_per_sec': rows / create_time,
+        'peak_rss_mb': max_rss_mb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(str(x) for x in SIZES),
+                        help='Comma-separated numbers of rows to load')
+    parser.add_argument('--factories', default=','.join(FACTORIES),
+                        help='Comma-separated factories to benchmark')
+    parser.add_argument('--bulk', action='store_true',
+                        help="Use the factories' bulk mode")
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--run', nargs=2, metavar=('FACTORY', 'SIZE'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run(args.run[0], int(args.run[1]), args.bulk)))
+        return
+
+    results = []
+    print('{:>10}  {:>5}  {:>7}  {:>9}  {:>11}  {:>10}  {:>13}  {:>8}'.format(
+        'factory', 'bulk', 'rows', 'load (s)', 'load rows/s',
+        'create (s)', 'create rows/s', 'RSS (MB)'))
+    for factory_name in args.factories.split(','):
+        for size in [int(x) for x in args.sizes.split(',')]:
+            cmd = [sys.executable, __file__, '--run', factory_name, str(size)]
+            output = subprocess.check_output(cmd + (['--bulk'] if args.bulk else []))
+            result = json.loads(output.decode().strip().splitlines()[-1])
+            results.append(result)
+            print('{factory:>10}  {bulk!s:>5}  {rows:>7}  {load_time:>9.2f}  '
+                  '{load_rows_per_sec:>11.0f}  {create_time:>10.2f}  '
+                  '{create_rows_per_sec:>13.0f}  {peak_rss_mb:>8.1f}'.format(**result))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare how long each available PyYAML loader takes to parse a large,
+generated fixtures file (roughly what a rendered template looks like).
+
+Usage::
+
+    python benchmarks/bench_yaml_loaders.py [size in MB, defaults to 50]
+"""
+import sys
+import time
+import yaml
+
+
+LOADERS = ['FullLoader', 'SafeLoader', 'CFullLoader', 'CSafeLoader']
+
+
+def generate_fixtures(size_mb: int) -> str:
+    parts = []
+    size = 0
+    i = 0
+    while size < size_mb * 1024 * 1024:
+        if i % 10000 == 0:
+            parts.append('Model{}:\n'.format(i // 10000))
+        part = ('  row{i}:\n'
+                '    name: "Row number {i}"\n'
+                '    email: row{i}@example.com\n'
+                '    count: {i}\n'
+                '    ratio: {ratio}\n'
+                '    active: {active}\n'
+                '    created_at: 2020-01-01T00:00:{sec:02d}\n'
+                '    parent: Model0(row{parent})\n'
+                '    tags: ["Tag(a, b, c)"]\n'
+                ).format(i=i, ratio=i / 7, active=str(bool(i % 2)).lower(),
+                         sec=i % 60, parent=i // 2)
+        parts.append(part)
+        size += len(part)
+        i += 1
+    return ''.join(parts)
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print('Generating {} MB of fixtures...'.format(size_mb))
+    document = generate_fixtures(size_mb)
+
+    print('libyaml available: {}'.format(yaml.__with_libyaml__))
+    for name in LOADERS:
+        loader = getattr(yaml, name, None)
+        if loader is None:
+            print('{:>12}: not available'.format(name))
+            continue
+
+        start = time.perf_counter()
+        yaml.load(document, Loader=loader)
+        elapsed = time.perf_counter() - start
+        print('{:>12}: {:7.2f}s ({:.1f} MB/s)'.format(name, elapsed, size_mb / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -20,3 +20,8 @@ class Article(models.Model):
     category = models.ForeignKey(Category, related_name="articles",
                                  null=True, blank=True, on_delete=models.SET_NULL)
     tags = models.ManyToManyField(Tag, related_name="articles")
+
+
+class Person(models.Model):
+    name = models.CharField(max_length=64, unique=True)
+    friends = models.ManyToManyField("self")
@@ -0,0 +1,117 @@
+import hashlib
+import jinja2
+import os
+
+from jinja2.bccache import Bucket
+from typing import *
+
+from .utils import load_pickle, save_pickle
+
+
+# bump this whenever the format of the cached data changes
+CACHE_VERSION = 2
+
+
+class RenderCache:
+    """
+    A size-bounded, on-disk cache of rendered and parsed fixture files. Entries
+    are pickled, and keyed by a hash of everything that affects the output of
+    rendering a template (see :meth:`make_key`). When the total size of the
+    cache exceeds ``max_size``, :meth:`evict` deletes the least recently used
+    entries (the loader calls it once after rendering the fixture files).
+
+    :param cache_dir: The directory to store the cache entries in
+    :param max_size: The maximum total size of the cache entries, in bytes
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = 100 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Hash the given parts (eg the template source, its filename and the
+        faker seed) into a cache key.
+        """
+        h = hashlib.sha256(str(CACHE_VERSION).encode())
+        for part in parts:
+            h.update(b'\0')
+            h.update(part.encode() if isinstance(part, str) else repr(part).encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get the cached value for the given key, or None if it isn't cached.
+        """
+        path = self._path(key)
+        value = load_pickle(path, CACHE_VERSION)
+        if value is None:
+            return None
+
+        # mark the entry as recently used
+        os.utime(path)
+        return value
+
+    def set(self, key: str, value: Any):
+        """
+        Store the value for the given key. (This doesn't evict old entries,
+        call :meth:`evict` when done setting them.)
+        """
+        save_pickle(self._path(key), CACHE_VERSION, value)
+
+    def evict(self):
+        """
+        Delete the least recently used entries until the cache fits in
+        :attr:`max_size`.
+        """
+        entries = []
+        total_size = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.pickle') and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_size += stat.st_size
+
+        for mtime, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + '.pickle')
+
+
+class TemplateBytecodeCache(jinja2.FileSystemBytecodeCache):
+    """
+    A Jinja bytecode cache of the compiled fixture templates, stored in
+    ``cache_dir``. Unlike Jinja's :class:`~jinja2.FileSystemBytecodeCache`,
+    the entries are keyed by the template name and a hash of its source, but
+    not by its filename, so that they stay valid when the fixture
+    directories get moved (eg between CI checkouts), as long as the template
+    names don't change. Entries for old versions of templates are never
+    deleted; use :meth:`clear` to do so.
+
+    :param cache_dir: The directory to store the compiled templates in
+    """
+
+    def __init__(self, cache_dir: str):
+        os.makedirs(cache_dir, exist_ok=True)
+        super().__init__(cache_dir, '__py_yaml_fixtures_%s.cache')
+
+    def get_bucket(self,
+                   environment: jinja2.Environment,
+                   name: str,
+                   filename: Optional[str],
+                   source: str,
+                   ) -> Bucket:
+        checksum = self.get_source_checksum(source)
+        bucket = Bucket(environment, self.get_cache_key(name + '|' + checksum), checksum)
+        self.load_bytecode(bucket)
+        return bucket
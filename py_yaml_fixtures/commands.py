@@ -10,6 +10,9 @@ from flask_unchained.bundles.sqlalchemy.commands import db
 from .factories.sqlalchemy import SQLAlchemyModelFactory
 from .fixtures_loader import FixturesLoader
 from .hooks import ModelFixtureFoldersHook
+from .stats import LoaderStats
+from .utils import parse_model_names
+from .watch import watch
 
 db_ext: SQLAlchemyUnchained = unchained.get_local_proxy('db')
 
@@ -17,8 +20,15 @@ db_ext: SQLAlchemyUnchained = unchained.get_local_proxy('db')
 @db.command(name='import-fixtures')
 @click.argument('bundles', nargs=-1,
                 help='Bundle names to load from (defaults to all)')
+@click.option('--profile', is_flag=True, default=False,
+              help='Print a summary of the time spent in each phase.')
+@click.option('--watch', 'watch_', is_flag=True, default=False,
+              help='Keep reloading the fixtures when the files change.')
+@click.option('--models', default=None,
+              help='Comma-separated model class names to load the fixtures of '
+                   '(along with the models they refer to).')
 @with_appcontext
-def import_fixtures(bundles=None):
+def import_fixtures(bundles=None, profile=False, watch_=False, models=None):
     fixture_dirs = []
     for path in ['db', 'db.fixtures']:
         root = unchained._app.root_path
@@ -41,7 +51,22 @@ def import_fixtures(bundles=None):
 
     factory = SQLAlchemyModelFactory(db_ext.session,
                                      unchained.sqlalchemy_bundle.models)
-    loader = FixturesLoader(factory, fixture_dirs=fixture_dirs)
-    loader.create_all(lambda identifier, model, created: click.echo(
-        f'{"Creating" if created else "Updating"} {identifier.key}: {model!r}'))
+    loader = FixturesLoader(factory, fixture_dirs=fixture_dirs,
+                            stats=LoaderStats() if profile else None)
+    only = parse_model_names(models)
+
+    def print_progress(identifier, model, created):
+        click.echo(f'{"Creating" if created else "Updating"} {identifier.key}: {model!r}')
+
+    if watch_:
+        try:
+            watch(loader, print_progress, echo=click.echo, only=only)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    for identifier, model, created in loader.iter_create(only):
+        print_progress(identifier, model, created)
     click.echo('Finished adding fixtures')
+    if profile:
+        click.echo(loader.stats.summary())
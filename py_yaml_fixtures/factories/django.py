@@ -1,28 +1,61 @@
 from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from datetime import date
+from functools import partial, reduce
 from types import FunctionType
 from typing import *
 
-from django.db import models as db
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.color import no_style
+from django.db import connections, models as db, router, transaction
 
 from ..types import Identifier
 from .. import utils
 from . import FactoryInterface
 
 
+# a sentinel for when an existing row must be looked up by its own query
+_QUERY = object()
+
+# a conversion plan marker for relationship fields
+_RELATIONSHIP = object()
+
+
 class DjangoModelFactory(FactoryInterface):
     """
     Concrete factory for the Django ORM.
     """
+    lookup_batch_size = 500
+    """The maximum number of rows to look up per query in bulk mode."""
+
     def __init__(self,
                  models: Union[List[type], Dict[str, type]],
                  date_factory: Optional[FunctionType] = None,
-                 datetime_factory: Optional[FunctionType] = None):
+                 datetime_factory: Optional[FunctionType] = None,
+                 date_formats: Optional[Dict[str, str]] = None,
+                 bulk: bool = False):
         super().__init__()
         self.models = (models if isinstance(models, dict)
                        else {model.__name__: model for model in models})
         self.model_instances = defaultdict(dict)
         self.datetime_factory = datetime_factory or utils.datetime_factory
         self.date_factory = date_factory or utils.date_factory
+        self.date_formats = date_formats or {}
+        """
+        Optional :meth:`~datetime.datetime.strptime` formats for date/datetime
+        fields, keyed by ``'ModelName.field_name'`` (passed to the date/datetime
+        factory as the ``format`` keyword argument).
+        """
+
+        self.bulk = bulk
+        """
+        Whether to write all the rows for each model class using
+        ``bulk_create`` and ``bulk_update`` (which bypass ``Model.save`` and
+        don't send signals), instead of ``update_or_create`` per row.
+        """
+
+        self._conversion_plans = defaultdict(dict)
 
         self.relations = {model.__name__: set() for model in self.models.values()}
         for model in self.models.values():
@@ -39,8 +72,28 @@ class DjangoModelFactory(FactoryInterface):
         if self.model_instances[identifier.class_name].get(identifier.key):
             return self.model_instances[identifier.class_name][identifier.key], False
 
-        kwargs, defaults, m2m = {}, {}, {}
         model_class = self.models[identifier.class_name]
+        kwargs, defaults, m2m = self._split_fields(model_class, data)
+
+        if not kwargs:
+            instance, created = model_class.objects.update_or_create(**defaults)
+        else:
+            instance, created = model_class.objects.update_or_create(**kwargs,
+                                                                     defaults=defaults)
+
+        for k, v in m2m.items():
+            for obj in v:
+                getattr(instance, k).add(obj)
+
+        self.model_instances[identifier.class_name][identifier.key] = instance
+        return instance, created
+
+    def _split_fields(self, model_class: type, data: Dict[str, Any]):
+        """
+        Split the data into unique lookup fields, other field values, and
+        many-to-many values.
+        """
+        kwargs, defaults, m2m = {}, {}, {}
         for k, v in data.items():
             if not hasattr(model_class, k):
                 defaults[k] = v
@@ -56,19 +109,265 @@ class DjangoModelFactory(FactoryInterface):
                 kwargs[k] = v
             else:
                 defaults[k] = v
+        return kwargs, defaults, m2m
 
-        if not kwargs:
-            instance, created = model_class.objects.update_or_create(**defaults)
-        else:
-            instance, created = model_class.objects.update_or_create(**kwargs,
-                                                                     defaults=defaults)
+    def bulk_create_or_update(self,
+                              class_name: str,
+                              rows: List[Tuple[Identifier, Dict[str, Any]]],
+                              ):
+        model_class = self.models[class_name]
+        connection = connections[router.db_for_write(model_class)]
+        if (not self.bulk
+                or not connection.features.can_return_rows_from_bulk_insert):
+            return super().bulk_create_or_update(class_name, rows)
 
-        for k, v in m2m.items():
-            for obj in v:
-                getattr(instance, k).add(obj)
+        split_rows = []
+        for identifier, data in rows:
+            if self.model_instances[class_name].get(identifier.key):
+                split_rows.append((identifier, None))
+            else:
+                split_rows.append((identifier, self._split_fields(model_class, data)))
+        existing = self._prefetch_existing(
+            model_class, [x[1] for x in split_rows if x[1] is not None])
 
-        self.model_instances[identifier.class_name][identifier.key] = instance
-        return instance, created
+        rv = []
+        to_create, to_update, update_fields, m2m_rows = [], [], set(), []
+        for identifier, split in split_rows:
+            if split is None:
+                rv.append((self.model_instances[class_name][identifier.key], False))
+                continue
+
+            kwargs, defaults, m2m = split
+            lookup = self._get_lookup_key(model_class, kwargs or defaults)
+            instance = existing.get(lookup, _QUERY) if lookup is not _QUERY else _QUERY
+            if instance is _QUERY:
+                try:
+                    instance = model_class.objects.get(**(kwargs or defaults))
+                except model_class.DoesNotExist:
+                    instance = None
+
+            created = instance is None
+            if created:
+                instance = model_class(**kwargs, **defaults)
+                to_create.append(instance)
+            else:
+                for k, v in defaults.items():
+                    setattr(instance, k, v)
+                to_update.append(instance)
+                update_fields.update(k for k in defaults if _is_concrete(model_class, k))
+
+            m2m_rows.append((instance, m2m))
+            self.model_instances[class_name][identifier.key] = instance
+            rv.append((instance, created))
+
+        if to_create:
+            model_class.objects.bulk_create(to_create)
+        if to_update and update_fields:
+            model_class.objects.bulk_update(to_update, update_fields)
+        self._bulk_add_m2m(model_class, m2m_rows)
+        return rv
+
+    def can_defer(self, class_name: str, column: str) -> bool:
+        field = self.models[class_name]._meta.get_field(column)
+        if isinstance(field, (db.ManyToManyField, db.ManyToManyRel)):
+            return True
+        return isinstance(field, db.ForeignKey) and field.null
+
+    def update_relationships(self,
+                             class_name: str,
+                             rows: List[Tuple[Identifier, Dict[str, Any]]],
+                             ):
+        model_class = self.models[class_name]
+        instances, fields, m2m_rows = [], set(), []
+        for identifier, data in rows:
+            instance = self.model_instances[class_name][identifier.key]
+            kwargs, defaults, m2m = self._split_fields(model_class, data)
+            for k, v in {**kwargs, **defaults}.items():
+                setattr(instance, k, v)
+                fields.add(k)
+            instances.append(instance)
+            m2m_rows.append((instance, m2m))
+
+        if fields:
+            model_class.objects.bulk_update(instances, fields)
+        self._bulk_add_m2m(model_class, m2m_rows)
+
+    def _bulk_add_m2m(self,
+                      model_class: type,
+                      m2m_rows: List[Tuple[db.Model, Dict[str, List[db.Model]]]]):
+        """
+        Add the many-to-many links for all the rows of a model class, with one
+        ``bulk_create`` per through model (existing links are left alone, like
+        with ``.add()``). Symmetrical links get added in both directions.
+        """
+        links = defaultdict(dict)  # ordered sets of (source pk, target pk)
+        for instance, m2m in m2m_rows:
+            for k, values in m2m.items():
+                field = model_class._meta.get_field(k)
+                if isinstance(field, db.ManyToManyRel):
+                    through = field.through
+                    source = field.field.m2m_reverse_field_name()
+                    target = field.field.m2m_field_name()
+                    symmetrical = False
+                else:
+                    through = field.remote_field.through
+                    source = field.m2m_field_name()
+                    target = field.m2m_reverse_field_name()
+                    symmetrical = field.remote_field.symmetrical
+                key = through, source, target
+                for obj in values or []:
+                    links[key][(instance.pk, obj.pk)] = None
+                    if symmetrical:
+                        links[key][(obj.pk, instance.pk)] = None
+
+        for (through, source, target), pairs in links.items():
+            through.objects.bulk_create([
+                through(**{source + '_id': source_pk, target + '_id': target_pk})
+                for source_pk, target_pk in pairs
+            ], ignore_conflicts=True)
+
+    def _get_lookup_key(self, model_class: type, filter_kwargs: Dict[str, Any]):
+        """
+        Convert the filter values into a hashable key of field attribute names
+        and values, or return ``_QUERY`` if they can't be looked up in batches.
+        """
+        if not filter_kwargs:
+            return _QUERY
+
+        lookup = {}
+        for k, v in filter_kwargs.items():
+            if not _is_concrete(model_class, k):
+                return _QUERY
+            field = model_class._meta.get_field(k)
+            if isinstance(v, db.Model):
+                v = v.pk
+            # the values must be of the same type as the ones the database
+            # returns (eg str for a CharField), to match the index
+            if v is not None:
+                try:
+                    v = field.to_python(v)
+                except ValidationError:
+                    return _QUERY
+            # NULLs can't be matched with IN, and floats and datetimes might not
+            # compare equal after a round trip through the database
+            if not (isinstance(v, (bool, int, str)) or type(v) is date):
+                return _QUERY
+            lookup[field.attname] = v
+
+        keys = tuple(sorted(lookup))
+        return keys, tuple(lookup[k] for k in keys)
+
+    def _prefetch_existing(self,
+                           model_class: type,
+                           split_rows: List[Tuple[Dict[str, Any], ...]],
+                           ) -> Dict[Any, Any]:
+        """
+        Look up the existing rows for all of the given data using a few batched
+        queries, returning an index of lookup key to model instance (or None).
+        """
+        index = {}
+        lookups = defaultdict(dict)
+        for kwargs, defaults, m2m in split_rows:
+            lookup = self._get_lookup_key(model_class, kwargs or defaults)
+            if lookup is not _QUERY:
+                keys, values = lookup
+                lookups[keys][values] = None
+                index[lookup] = None
+
+        for keys, values in lookups.items():
+            values = list(values)
+            for i in range(0, len(values), self.lookup_batch_size):
+                batch = values[i:i+self.lookup_batch_size]
+                if len(keys) == 1:
+                    q = db.Q(**{keys[0] + '__in': [v[0] for v in batch]})
+                else:
+                    q = reduce(lambda a, b: a | b,
+                               [db.Q(**dict(zip(keys, v))) for v in batch])
+                for instance in model_class.objects.filter(q):
+                    lookup = keys, tuple(getattr(instance, k) for k in keys)
+                    # let the fallback query handle duplicate matches
+                    index[lookup] = _QUERY if index.get(lookup) is not None else instance
+        return index
+
+    def release(self, class_name: str):
+        for key, instance in self.model_instances.pop(class_name, {}).items():
+            self.primary_keys[Identifier(class_name, key)] = instance.pk
+
+    def get_reference(self, identifier: Identifier):
+        model_class = self.models[identifier.class_name]
+        # an instance with every field but the primary key deferred
+        return model_class.from_db(router.db_for_read(model_class),
+                                   [model_class._meta.pk.attname],
+                                   [self.primary_keys[identifier]])
+
+    def dump_tables(self, class_names: List[str]) -> Dict[str, Tuple[List[str], List[tuple]]]:
+        rv = {}
+        for model_class in self._get_table_models(class_names):
+            fields = [field.attname for field in model_class._meta.concrete_fields]
+            rv[model_class._meta.db_table] = (
+                fields, list(model_class._base_manager.values_list(*fields)))
+        return rv
+
+    def restore_tables(self, tables: Dict[str, Tuple[List[str], List[tuple]]]):
+        table_models = {model_class._meta.db_table: model_class
+                        for model_class in apps.get_models(include_auto_created=True)}
+        models_by_db = defaultdict(list)
+        for name in tables:
+            model_class = table_models[name]
+            models_by_db[router.db_for_write(model_class)].append(model_class)
+
+        for using, model_classes in models_by_db.items():
+            connection = connections[using]
+            with transaction.atomic(using=using), connection.cursor() as cursor:
+                for model_class in reversed(model_classes):
+                    cursor.execute('DELETE FROM {table}'.format(
+                        table=connection.ops.quote_name(model_class._meta.db_table)))
+                for model_class in model_classes:
+                    fields, rows = tables[model_class._meta.db_table]
+                    model_class._base_manager.using(using).bulk_create(
+                        [model_class(**dict(zip(fields, row))) for row in rows])
+
+                # the sequences of the primary keys don't know about the inserted rows
+                for sql in connection.ops.sequence_reset_sql(no_style(), model_classes):
+                    cursor.execute(sql)
+
+    def _get_table_models(self, class_names: List[str]) -> List[type]:
+        """
+        The given model classes, followed by the (auto created) through models
+        of the many-to-many fields between them.
+        """
+        model_classes = [self.models[class_name] for class_name in class_names]
+        through_models = []
+        for model_class in model_classes:
+            for field in model_class._meta.local_many_to_many:
+                through = field.remote_field.through
+                if (through._meta.auto_created
+                        and field.related_model in model_classes
+                        and through not in through_models):
+                    through_models.append(through)
+        return model_classes + through_models
+
+    def rollback(self):
+        # Django runs in autocommit mode, so there's nothing to roll back
+        self.model_instances.clear()
+
+    async def run_sync(self, fn: Callable[..., Any], *args) -> Any:
+        # asgiref is only a dependency of Django 3.0+
+        from asgiref.sync import sync_to_async
+
+        # the Django ORM can't be used from async code directly
+        return await sync_to_async(fn)(*args)
+
+    @contextmanager
+    def count_statements(self, callback: Callable[[], None]):
+        def wrapper(execute, sql, params, many, context):
+            callback()
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(wrapper))
+            yield
 
     def get_relationships(self, class_name: str):
         return self.relations[class_name]
@@ -77,16 +376,46 @@ class DjangoModelFactory(FactoryInterface):
                              identifier: Identifier,
                              data: Dict[str, Any],
                              ):
-        model_class = self.models[identifier.class_name]
-        relationships = self.get_relationships(identifier.class_name)
+        plan = self._conversion_plans[identifier.class_name]
         rv = data.copy()
         for field_name, value in data.items():
-            if field_name in relationships:
+            try:
+                converter = plan[field_name]
+            except KeyError:
+                converter = plan[field_name] = self._get_converter(
+                    identifier.class_name, field_name)
+
+            if converter is _RELATIONSHIP:
                 rv[field_name] = self.loader.convert_identifiers(value)
-                continue
-            field = model_class._meta.get_field(field_name)
-            if isinstance(field, db.fields.DateField):
-                rv[field_name] = self.date_factory(value)
-            elif isinstance(field, db.fields.DateTimeField):
-                rv[field_name] = self.datetime_factory(value)
+            elif converter is not None:
+                rv[field_name] = converter(value)
         return rv
+
+    def _get_converter(self,
+                       class_name: str,
+                       field_name: str,
+                       ) -> Union[Callable[[Any], Any], object, None]:
+        """
+        Determine how to convert the values of a field, for the conversion
+        plan of a model class: either a function taking the value to convert,
+        ``_RELATIONSHIP`` for relationships, or None if the values get used as-is.
+        """
+        if field_name in self.get_relationships(class_name):
+            return _RELATIONSHIP
+
+        field = self.models[class_name]._meta.get_field(field_name)
+        format = self.date_formats.get('{}.{}'.format(class_name, field_name))
+        # DateTimeField is a subclass of DateField
+        if isinstance(field, db.fields.DateTimeField):
+            return (partial(self.datetime_factory, format=format) if format
+                    else self.datetime_factory)
+        elif isinstance(field, db.fields.DateField):
+            return partial(self.date_factory, format=format) if format else self.date_factory
+        return None
+
+
+def _is_concrete(model_class: type, field_name: str) -> bool:
+    try:
+        return model_class._meta.get_field(field_name).concrete
+    except FieldDoesNotExist:
+        return False
@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from typing import *
 
 from ..types import Identifier
@@ -11,6 +12,7 @@ class FactoryInterface:
     def __init__(self):
         from ..fixtures_loader import FixturesLoader
         self.loader: FixturesLoader = None  # set by the FixturesLoader
+        self.primary_keys: Dict[Identifier, Any] = {}  # set by release()
 
     def create_or_update(self,
                          identifier: Identifier,
@@ -27,6 +29,52 @@ class FactoryInterface:
         """
         raise NotImplementedError
 
+    def bulk_create_or_update(self,
+                              class_name: str,
+                              rows: List[Tuple[Identifier, Dict[str, Any]]],
+                              ) -> List[Tuple[object, bool]]:
+        """
+        Create or update all of the models for a single model class. The
+        loader calls this once per model class, in dependency order. The
+        default implementation simply calls :meth:`create_or_update` for each
+        row, but factories can override it to write the rows in batches.
+
+        :param class_name: The name of the model class being created
+        :param rows: A list of two-tuples of :class:`Identifier` and the
+                     converted data for it
+        :return: A list of two-tuples of model instance and whether or not it
+                 was created (in the same order as ``rows``)
+        """
+        return [self.create_or_update(identifier, data) for identifier, data in rows]
+
+    def can_defer(self, class_name: str, column: str) -> bool:
+        """
+        Whether or not the given relationship column can be left unset when
+        the model gets created, and be set afterwards with
+        :meth:`update_relationships`. The loader uses this to break circular
+        dependencies between models (eg self-referential foreign keys), so
+        factories that return True must implement :meth:`update_relationships`.
+
+        :param class_name: The name of the model class
+        :param column: The name of the relationship column
+        :return: True if the column can be deferred (eg a nullable foreign key)
+        """
+        return False
+
+    def update_relationships(self,
+                             class_name: str,
+                             rows: List[Tuple[Identifier, Dict[str, Any]]],
+                             ):
+        """
+        Set the values of deferred relationship columns (see :meth:`can_defer`)
+        on models that were already created.
+
+        :param class_name: The name of the model class being updated
+        :param rows: A list of two-tuples of :class:`Identifier` and the
+                     converted values of its deferred columns
+        """
+        raise NotImplementedError
+
     def get_relationships(self, class_name: str) -> Set[str]:
         """
         Return a list of model attribute names that could have relationships for
@@ -57,6 +105,30 @@ class FactoryInterface:
         """
         raise NotImplementedError
 
+    def release(self, class_name: str):
+        """
+        Called by :meth:`FixturesLoader.iter_create` once all the models for
+        the given class have been created (and updated). Factories can
+        implement this to persist the models (without committing), record
+        their primary keys in :attr:`primary_keys` (keyed by
+        :class:`Identifier`), and drop their references to the model
+        instances. Identifiers in :attr:`primary_keys` get resolved with
+        :meth:`get_reference` from then on.
+
+        :param class_name: The name of the model class to release
+        """
+        pass
+
+    def get_reference(self, identifier: Identifier) -> object:
+        """
+        Return a model instance for a released identifier (see :meth:`release`),
+        suitable for setting as the value of a relationship.
+
+        :param identifier: An identifier whose primary key is in :attr:`primary_keys`
+        :return: The model instance (or a stand-in for it)
+        """
+        raise NotImplementedError
+
     def commit(self):
         """
         If your ORM implements the data mapper pattern instead of active
@@ -64,3 +136,63 @@ class FactoryInterface:
         all the models have been added to it.
         """
         pass
+
+    def rollback(self):
+        """
+        Called when loading the fixtures failed part way through (eg in watch
+        mode, which keeps going after errors). Implement this to discard any
+        uncommitted changes, along with any model instances the factory keeps
+        track of.
+        """
+        pass
+
+    def dump_tables(self, class_names: List[str]) -> Dict[str, Tuple[List[str], List[tuple]]]:
+        """
+        Used by :meth:`FixturesLoader.create_snapshot`. Implement this to read
+        every row of the tables of the given model classes (including their
+        many-to-many association tables), for :meth:`restore_tables`.
+
+        :param class_names: The names of the model classes, in creation order
+        :return: A dict keyed by table name (in the order to restore them in),
+                 where the values are two-tuples of the list of column names
+                 and the list of rows
+        """
+        raise NotImplementedError
+
+    def restore_tables(self, tables: Dict[str, Tuple[List[str], List[tuple]]]):
+        """
+        Used by :meth:`FixturesLoader.restore_snapshot`. Implement this to
+        replace all of the rows of the given tables with the given rows (as
+        returned by :meth:`dump_tables`), using bulk operations.
+
+        :param tables: A dict keyed by table name, where the values are
+                       two-tuples of the list of column names and the list of rows
+        """
+        raise NotImplementedError
+
+    async def run_sync(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Used by :meth:`FixturesLoader.create_all_async` to call the (sync)
+        loading code for one model class at a time, with the factory's other
+        methods being called from within ``fn``. Factories for ORMs with an
+        asyncio API can implement this to run ``fn`` in a unit of work of its
+        own (eg a new session and transaction), possibly concurrently with
+        other calls. By default ``fn`` simply gets called.
+
+        :param fn: The function to call
+        :param args: The arguments to call it with
+        :return: The return value of ``fn``
+        """
+        return fn(*args)
+
+    @contextmanager
+    def count_statements(self, callback: Callable[[], None]):
+        """
+        Used when profiling (see :class:`~py_yaml_fixtures.stats.LoaderStats`).
+        While the context manager is active, ``callback`` should be called once
+        for every SQL statement the factory executes. By default statements are
+        not counted.
+
+        :param callback: The function to call for each statement
+        """
+        yield
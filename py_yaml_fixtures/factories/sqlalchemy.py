@@ -1,26 +1,44 @@
 from collections import defaultdict
+from contextlib import contextmanager
 from datetime import date, datetime, time, timedelta
-from functools import lru_cache
+from functools import lru_cache, partial
 from types import FunctionType
 from typing import *
 
+import sqlalchemy as sa
+
 from sqlalchemy import orm as sa_orm
 from sqlalchemy.ext.associationproxy import AssociationProxy
+from sqlalchemy.orm.interfaces import MANYTOMANY, MANYTOONE, ONETOMANY
 
 from ..types import Identifier
 from .. import utils
 from . import FactoryInterface
 
 
+# a sentinel for when an existing row must be looked up by its own query
+_QUERY = object()
+
+# a conversion plan marker for relationship columns
+_RELATIONSHIP = object()
+
+
 class SQLAlchemyModelFactory(FactoryInterface):
     """
     Concrete factory for the SQLAlchemy ORM.
     """
+    lookup_batch_size = 500
+    """The maximum number of parameters per query when looking up existing rows."""
+
     def __init__(self,
                  session: sa_orm.Session,
                  models: Union[List[type], Dict[str, type]],
                  date_factory: Optional[FunctionType] = None,
-                 datetime_factory: Optional[FunctionType] = None):
+                 datetime_factory: Optional[FunctionType] = None,
+                 date_formats: Optional[Dict[str, str]] = None,
+                 bulk: bool = False,
+                 batch_size: Optional[int] = None,
+                 commit_every: Optional[int] = None):
         """
         :param session: the sqlalchemy session
         :param models: list of model classes, or dictionary of models by name
@@ -28,6 +46,25 @@ class SQLAlchemyModelFactory(FactoryInterface):
             parameter, the text value to convert)
         :param datetime_factory: function used to generate datetimes (takes one
             parameter, the text value to convert)
+        :param date_formats: optional :meth:`~datetime.datetime.strptime`
+            formats for date/datetime columns, keyed by ``'ModelName.column'``.
+            The format gets passed to the date/datetime factory as the
+            ``format`` keyword argument (instead of guessing the format).
+        :param bulk: whether to write all the rows for each model class using
+            batched INSERTs/UPDATEs instead of the unit of work. In bulk mode,
+            the "model instances" are dictionaries of column values (including
+            the primary key), no ORM events are fired, and association proxies
+            are not supported.
+        :param batch_size: the maximum number of rows to write at once. Without
+            bulk mode, the session gets flushed after every ``batch_size`` rows
+            (instead of holding all of the pending instances until the commit).
+            In bulk mode, this is the number of rows per INSERT/UPDATE batch.
+        :param commit_every: commit the session after (about) every
+            ``commit_every`` rows have been written, instead of only once at
+            the end, to keep the transactions short. Note that the rows written
+            so far stay committed if a later row fails. (Without bulk mode,
+            the instances get expired by the commits, unless the session was
+            created with ``expire_on_commit=False``.)
         """
         super().__init__()
         self.session = session
@@ -36,8 +73,19 @@ class SQLAlchemyModelFactory(FactoryInterface):
         self.model_instances = defaultdict(dict)
         self.datetime_factory = datetime_factory or utils.datetime_factory
         self.date_factory = date_factory or utils.date_factory
+        self.date_formats = date_formats or {}
+        self.bulk = bulk
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self._existing = defaultdict(dict)
+        self._conversion_plans = defaultdict(dict)
+        self._unflushed = 0
+        self._uncommitted = 0
 
     def create_or_update(self, identifier: Identifier, data: Dict[str, Any]):
+        if self.bulk and identifier.key in self.model_instances[identifier.class_name]:
+            return self.model_instances[identifier.class_name][identifier.key], False
+
         instance = self._get_existing(identifier, data)
         created = False
         if not instance:
@@ -54,11 +102,33 @@ class SQLAlchemyModelFactory(FactoryInterface):
 
     def _get_existing(self, identifier: Identifier, data: Dict[str, Any]):
         model_class = self.models[identifier.class_name]
-        relationships = self.get_relationships(identifier.class_name)
         instance = self.model_instances[identifier.class_name].get(identifier.key)
         if isinstance(instance, model_class) and instance in self.session:
             return instance
 
+        lookup = self._get_lookup_key(identifier.class_name, data)
+        if lookup is None:
+            return None
+
+        # use the results of _prefetch_existing, if possible
+        if lookup is not _QUERY:
+            instance = self._existing[identifier.class_name].get(lookup, _QUERY)
+            if instance is not _QUERY:
+                return instance
+
+        filter_kwargs = self._get_filter_kwargs(identifier.class_name, data)
+        with self.session.no_autoflush:
+            return self.session.query(model_class).filter(
+                *[getattr(model_class, k) == v for k, v in filter_kwargs.items()]
+            ).one_or_none()
+
+    def _get_filter_kwargs(self, class_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Determine the values to filter by when looking for an existing row.
+        """
+        model_class = self.models[class_name]
+        relationships = self.get_relationships(class_name)
+
         # try to filter by primary key or any unique columns
         filter_kwargs = {}
         for col in model_class.__mapper__.columns:
@@ -71,21 +141,428 @@ class SQLAlchemyModelFactory(FactoryInterface):
                              if (k in relationships and hasattr(v, '__mapper__'))
                              or v is None
                              or isinstance(v, (bool, int, str, float))}
+        return filter_kwargs
+
+    def _get_lookup_key(self, class_name: str, data: Dict[str, Any]):
+        """
+        Convert the filter values for the given data into a hashable key of
+        column names and values. Returns None if there can't be an existing
+        row, or ``_QUERY`` if the values can't be looked up in batches.
+        """
+        mapper = self.models[class_name].__mapper__
+        filter_kwargs = self._get_filter_kwargs(class_name, data)
         if not filter_kwargs:
             return None
 
-        filter_expressions = []
+        lookup = {}
         for k, v in filter_kwargs.items():
-            filter_expressions.append(getattr(model_class, k) == v)
-
-            if k in relationships:
-                for pk in v.__mapper__.primary_key:
-                    pk_value = getattr(v, pk.name)
+            prop = mapper.relationships.get(k)
+            if prop is None:
+                # the values must be of the same type as the ones the database
+                # returns (eg str for a String column), to match the index
+                v = _coerce_lookup_value(mapper.columns.get(k), v)
+                if v is _QUERY:
+                    return _QUERY
+                lookup[k] = v
+            elif prop.direction is MANYTOONE:
+                for local, remote in prop.local_remote_pairs:
+                    pk_value = getattr(v, _attr_key(prop.mapper, remote))
                     if pk_value is None:
                         return None
+                    lookup[_attr_key(mapper, local)] = pk_value
+            else:
+                return _QUERY
+
+        # NULLs can't be matched with IN, and floats and datetimes might not
+        # compare equal after a round trip through the database
+        if not all(isinstance(v, (bool, int, str)) or type(v) is date
+                   for v in lookup.values()):
+            return _QUERY
+
+        keys = tuple(sorted(lookup))
+        return keys, tuple(lookup[k] for k in keys)
+
+    def _prefetch_existing(self,
+                           class_name: str,
+                           rows: List[Tuple[Identifier, Dict[str, Any]]]):
+        """
+        Look up the existing rows for all of the given data using a few
+        batched ``IN`` queries, storing the results in an in-memory index so
+        that :meth:`_get_existing` doesn't need to query for each row.
+        """
+        model_class = self.models[class_name]
+        pk_keys = _pk_keys(model_class.__mapper__)
+        index = self._existing[class_name] = {}
+
+        lookups = defaultdict(dict)
+        for identifier, data in rows:
+            if self.bulk:
+                # use the same keys as _get_existing_pk (with foreign key columns)
+                data, _ = self._to_mapping(class_name, data)
+            lookup = self._get_lookup_key(class_name, data)
+            if lookup is not None and lookup is not _QUERY:
+                keys, values = lookup
+                lookups[keys][values] = None
+                index[lookup] = None
+
+        for keys, values in lookups.items():
+            columns = [getattr(model_class, k) for k in keys]
+            entities = ([getattr(model_class, k) for k in pk_keys]
+                        if self.bulk else [model_class])
+            column = columns[0] if len(columns) == 1 else sa.tuple_(*columns)
+            values = [v[0] for v in values] if len(columns) == 1 else list(values)
+
+            batch_size = max(1, self.lookup_batch_size // len(columns))
+            for i in range(0, len(values), batch_size):
+                with self.session.no_autoflush:
+                    results = self.session.query(*entities, *columns).filter(
+                        column.in_(values[i:i+batch_size])).all()
+                for row in results:
+                    lookup = keys, tuple(row[len(entities):])
+                    existing = (dict(zip(pk_keys, row[:len(entities)]))
+                                if self.bulk else row[0])
+                    # let the fallback query raise MultipleResultsFound for duplicates
+                    index[lookup] = _QUERY if index.get(lookup) is not None else existing
+
+    def bulk_create_or_update(self,
+                              class_name: str,
+                              rows: List[Tuple[Identifier, Dict[str, Any]]],
+                              ) -> List[Tuple[Dict[str, Any], bool]]:
+        self._prefetch_existing(class_name, rows)
+        try:
+            rv = []
+            batch_size = (self.batch_size if self.bulk else None) or len(rows) or 1
+            for i in range(0, len(rows), batch_size):
+                batch = rows[i:i+batch_size]
+                if self.bulk:
+                    rv.extend(self._bulk_create_or_update(class_name, batch))
+                else:
+                    rv.extend(super().bulk_create_or_update(class_name, batch))
+                self._rows_written(len(batch))
+            return rv
+        finally:
+            self._existing.pop(class_name, None)
+
+    def _rows_written(self, count: int):
+        """
+        Flush and/or commit the session, if a batch of rows is done.
+        """
+        self._unflushed += count
+        self._uncommitted += count
+        if self.commit_every and self._uncommitted >= self.commit_every:
+            self.commit()
+        elif (not self.bulk and self.batch_size
+                and self._unflushed >= self.batch_size):
+            self.session.flush()
+            self._unflushed = 0
+
+    def _bulk_create_or_update(self,
+                               class_name: str,
+                               rows: List[Tuple[Identifier, Dict[str, Any]]],
+                               ) -> List[Tuple[Dict[str, Any], bool]]:
+        model_class = self.models[class_name]
+        mapper = model_class.__mapper__
+        pk_keys = _pk_keys(mapper)
+
+        rv = []
+        inserts, updates, collections = [], [], []
+        for identifier, data in rows:
+            mapping, row_collections = self._to_mapping(class_name, data)
+            collections.extend((mapping, prop, value) for prop, value in row_collections)
+
+            existing = self._get_existing_pk(class_name, mapping)
+            if existing:
+                mapping.update(existing)
+                updates.append(mapping)
+            else:
+                inserts.append(mapping)
+            self.model_instances[class_name][identifier.key] = mapping
+            rv.append((mapping, not existing))
+
+        with self.session.no_autoflush:
+            if inserts:
+                # populates the primary keys on each mapping, using RETURNING if
+                # the database supports it
+                self.session.bulk_insert_mappings(model_class, inserts, return_defaults=True)
+            if updates:
+                self.session.bulk_update_mappings(model_class, updates)
+            self._bulk_set_collections(mapper, collections,
+                                       [{k: m[k] for k in pk_keys} for m in updates])
+        return rv
+
+    def _to_mapping(self,
+                    class_name: str,
+                    data: Dict[str, Any],
+                    ) -> Tuple[Dict[str, Any], List[Tuple[sa_orm.RelationshipProperty, Any]]]:
+        """
+        Convert the data for a row into a mapping of column attribute names to
+        values (for bulk mode), along with the values of any one-to-many or
+        many-to-many relationships (which can only be set after the row has a
+        primary key).
+        """
+        mapper = self.models[class_name].__mapper__
+        mapping, collections = {}, []
+        for key, value in data.items():
+            prop = mapper.relationships.get(key)
+            if prop is None and key in self.get_relationships(class_name):
+                raise ValueError(
+                    'Association proxies are not supported in bulk mode (got '
+                    '{cls}.{key}), load the {cls} fixtures with bulk=False '
+                    'instead'.format(cls=class_name, key=key))
+            elif prop is None:
+                mapping[key] = value
+            elif prop.direction is MANYTOONE:
+                for local, remote in prop.local_remote_pairs:
+                    mapping[_attr_key(mapper, local)] = (
+                        value[_attr_key(prop.mapper, remote)] if value else None)
+            else:
+                collections.append((prop, value))
+        return mapping, collections
+
+    def can_defer(self, class_name: str, column: str) -> bool:
+        prop = self.models[class_name].__mapper__.relationships.get(column)
+        if prop is None:
+            return False
+        elif prop.direction is MANYTOONE:
+            return all(local.nullable for local, _ in prop.local_remote_pairs)
+        elif prop.direction is ONETOMANY:
+            return all(remote.nullable for _, remote in prop.local_remote_pairs)
+        return True
+
+    def update_relationships(self,
+                             class_name: str,
+                             rows: List[Tuple[Identifier, Dict[str, Any]]],
+                             ):
+        if not self.bulk:
+            # insert the rows first, so that the unit of work doesn't see a cycle
+            self.session.flush()
+            for identifier, data in rows:
+                instance = self.model_instances[class_name][identifier.key]
+                for attr, value in data.items():
+                    setattr(instance, attr, value)
+            # the unit of work batches the UPDATEs for us
+            self.session.flush()
+            return
+
+        mapper = self.models[class_name].__mapper__
+        pk_keys = _pk_keys(mapper)
+        updates, collections = [], []
+        for identifier, data in rows:
+            instance = self.model_instances[class_name][identifier.key]
+            mapping, row_collections = self._to_mapping(class_name, data)
+            instance.update(mapping)
+            if mapping:
+                updates.append(dict(mapping, **{k: instance[k] for k in pk_keys}))
+            collections.extend((instance, prop, value) for prop, value in row_collections)
 
         with self.session.no_autoflush:
-            return self.session.query(model_class).filter(*filter_expressions).one_or_none()
+            if updates:
+                self.session.bulk_update_mappings(mapper.class_, updates)
+            self._bulk_set_collections(
+                mapper, collections,
+                [{k: instance[k] for k in pk_keys} for instance, _, _ in collections])
+
+    def _bulk_set_collections(self,
+                              mapper: sa_orm.Mapper,
+                              collections: List[Tuple[Dict[str, Any],
+                                                      sa_orm.RelationshipProperty,
+                                                      Any]],
+                              updated_pks: List[Dict[str, Any]]):
+        """
+        Set the values of one-to-many and many-to-many relationships, after the
+        rows they belong to have primary keys. Like assigning to the
+        relationships of model instances, the values replace the existing
+        related rows of the ``updated_pks`` rows.
+        """
+        pk_keys = _pk_keys(mapper)
+        updated = {tuple(pk[k] for k in pk_keys) for pk in updated_pks}
+        replaced = defaultdict(list)  # prop -> mappings of updated rows
+        kept = defaultdict(set)  # prop -> primary keys of the related rows
+        fk_updates = defaultdict(list)
+        secondary_rows = defaultdict(list)
+        for mapping, prop, value in collections:
+            value = value if isinstance(value, list) else [value] if value else []
+            if tuple(mapping[k] for k in pk_keys) in updated:
+                replaced[prop].append(mapping)
+            if prop.direction is ONETOMANY:
+                for related in value:
+                    update = {k: related[k] for k in _pk_keys(prop.mapper)}
+                    for local, remote in prop.local_remote_pairs:
+                        update[_attr_key(prop.mapper, remote)] = \
+                            mapping[_attr_key(mapper, local)]
+                    related.update(update)
+                    fk_updates[prop.mapper.class_].append(update)
+                    kept[prop].add(tuple(related[k] for k in _pk_keys(prop.mapper)))
+            elif prop.direction is MANYTOMANY:
+                for related in value:
+                    row = {}
+                    for local, secondary_col in prop.synchronize_pairs:
+                        row[secondary_col.key] = mapping[_attr_key(mapper, local)]
+                    for remote, secondary_col in prop.secondary_synchronize_pairs:
+                        row[secondary_col.key] = related[_attr_key(prop.mapper, remote)]
+                    secondary_rows[prop].append(row)
+
+        for prop, mappings in replaced.items():
+            if prop.direction is ONETOMANY:
+                self._remove_orphans(mapper, prop, mappings, kept[prop])
+            elif prop.direction is MANYTOMANY:
+                self.session.execute(prop.secondary.delete().where(sa.or_(*[
+                    sa.and_(*[secondary_col == m[_attr_key(mapper, local)]
+                              for local, secondary_col in prop.synchronize_pairs])
+                    for m in mappings])))
+
+        for related_class, updates in fk_updates.items():
+            self.session.bulk_update_mappings(related_class, updates)
+
+        for prop, rows in secondary_rows.items():
+            self.session.execute(prop.secondary.insert(), rows)
+
+    def _remove_orphans(self,
+                        mapper: sa_orm.Mapper,
+                        prop: sa_orm.RelationshipProperty,
+                        mappings: List[Dict[str, Any]],
+                        kept: Set[tuple]):
+        """
+        Unlink the rows of the one-to-many relationship ``prop`` that belong to
+        the given rows, except the ``kept`` ones (by primary key): by clearing
+        their foreign keys, or by deleting them if the relationship cascades
+        ``delete-orphan``.
+        """
+        related_class = prop.mapper.class_
+        where = [sa.or_(*[
+            sa.and_(*[remote == m[_attr_key(mapper, local)]
+                      for local, remote in prop.local_remote_pairs])
+            for m in mappings])]
+        if kept:
+            pk_columns = prop.mapper.primary_key
+            where.append(sa.not_(sa.tuple_(*pk_columns).in_(kept)
+                                 if len(pk_columns) > 1
+                                 else pk_columns[0].in_([pk for pk, in kept])))
+
+        if prop.cascade.delete_orphan:
+            statement = sa.delete(related_class)
+        else:
+            statement = sa.update(related_class).values({
+                _attr_key(prop.mapper, remote): None
+                for _, remote in prop.local_remote_pairs})
+        self.session.execute(statement.where(*where),
+                             execution_options={'synchronize_session': False})
+
+    def _get_existing_pk(self,
+                         class_name: str,
+                         mapping: Dict[str, Any],
+                         ) -> Optional[Dict[str, Any]]:
+        """
+        Like :meth:`_get_existing`, but for bulk mode (where relationships
+        have already been converted to their foreign key column values).
+        Returns the primary key of the matching row, if any.
+        """
+        lookup = self._get_lookup_key(class_name, mapping)
+        if lookup is None:
+            return None
+
+        if lookup is not _QUERY:
+            existing = self._existing[class_name].get(lookup, _QUERY)
+            if existing is not _QUERY:
+                return existing
+
+        model_class = self.models[class_name]
+        pk_keys = _pk_keys(model_class.__mapper__)
+        filter_kwargs = self._get_filter_kwargs(class_name, mapping)
+        row = self.session.query(*[getattr(model_class, k) for k in pk_keys]).filter(
+            *[getattr(model_class, k) == v for k, v in filter_kwargs.items()]
+        ).one_or_none()
+        return dict(zip(pk_keys, row)) if row else None
+
+    def release(self, class_name: str):
+        if not self.bulk:
+            # make sure all of the instances have primary keys
+            self.session.flush()
+
+        pk_keys = _pk_keys(self.models[class_name].__mapper__)
+        for key, instance in self.model_instances.pop(class_name, {}).items():
+            if self.bulk:
+                pk = tuple(instance[k] for k in pk_keys)
+            else:
+                pk = sa.inspect(instance).identity
+            self.primary_keys[Identifier(class_name, key)] = \
+                pk[0] if len(pk) == 1 else pk
+
+    def get_reference(self, identifier: Identifier):
+        mapper = self.models[identifier.class_name].__mapper__
+        pk_keys = _pk_keys(mapper)
+        pk = self.primary_keys[identifier]
+        pk = pk if len(pk_keys) > 1 else (pk,)
+        if self.bulk:
+            return dict(zip(pk_keys, pk))
+
+        instance = self.session.identity_map.get(mapper.identity_key_from_primary_key(pk))
+        if instance is None:
+            # build a persistent instance with only its primary key loaded
+            # (instead of querying for the row)
+            instance = mapper.class_manager.new_instance()
+            for key, value in zip(pk_keys, pk):
+                setattr(instance, key, value)
+            sa_orm.make_transient_to_detached(instance)
+            self.session.add(instance)
+        return instance
+
+    def dump_tables(self, class_names: List[str]) -> Dict[str, Tuple[List[str], List[tuple]]]:
+        rv = {}
+        with self.session.no_autoflush:
+            for table in self._get_tables(class_names):
+                rv[table.fullname] = ([col.key for col in table.columns],
+                                      [tuple(row) for row in
+                                       self.session.execute(table.select())])
+        return rv
+
+    def restore_tables(self, tables: Dict[str, Tuple[List[str], List[tuple]]]):
+        metadata_tables = {}
+        for model_class in self.models.values():
+            metadata_tables.update(model_class.__mapper__.local_table.metadata.tables)
+
+        with self.session.no_autoflush:
+            for name in reversed(list(tables)):
+                self.session.execute(metadata_tables[name].delete())
+            for name, (columns, rows) in tables.items():
+                if rows:
+                    self.session.execute(metadata_tables[name].insert(),
+                                         [dict(zip(columns, row)) for row in rows])
+
+            # the sequences of the primary keys don't know about the inserted rows
+            if self.session.get_bind().dialect.name == 'postgresql':
+                self._reset_sequences([metadata_tables[name] for name in tables])
+        self.session.expire_all()
+
+    def _get_tables(self, class_names: List[str]) -> List[sa.Table]:
+        """
+        The tables of the given model classes (base classes first), followed
+        by the association tables of the many-to-many relationships between them.
+        """
+        rv = {}
+        secondary_tables = {}
+        for class_name in class_names:
+            mapper = self.models[class_name].__mapper__
+            for table in reversed([m.local_table for m in mapper.iterate_to_root()]):
+                rv[table] = None
+            for prop in mapper.relationships:
+                if (isinstance(prop.secondary, sa.Table)
+                        and prop.mapper.class_.__name__ in class_names):
+                    secondary_tables[prop.secondary] = None
+        rv.update(secondary_tables)
+        return list(rv)
+
+    def _reset_sequences(self, tables: List[sa.Table]):
+        preparer = self.session.get_bind().dialect.identifier_preparer
+        for table in tables:
+            if len(table.primary_key.columns) != 1:
+                continue
+            col = list(table.primary_key.columns)[0]
+            if isinstance(col.type, sa.Integer):
+                self.session.execute(sa.select(sa.func.setval(
+                    sa.func.pg_get_serial_sequence(preparer.format_table(table), col.name),
+                    sa.select(sa.func.coalesce(sa.func.max(col), 0) + 1).scalar_subquery(),
+                    False)))
 
     @lru_cache()
     def get_relationships(self, class_name: str) -> Set[str]:
@@ -105,25 +582,112 @@ class SQLAlchemyModelFactory(FactoryInterface):
                              identifier: Identifier,
                              data: Dict[str, Any],
                              ) -> Dict[str, Any]:
-        model_class = self.models[identifier.class_name]
-        relationships = self.get_relationships(identifier.class_name)
+        plan = self._conversion_plans[identifier.class_name]
         rv = data.copy()
         for col_name, value in data.items():
-            col = getattr(model_class, col_name)
-            if col_name in relationships:
+            try:
+                converter = plan[col_name]
+            except KeyError:
+                converter = plan[col_name] = self._get_converter(
+                    identifier.class_name, col_name)
+
+            if converter is _RELATIONSHIP:
                 rv[col_name] = self.loader.convert_identifiers(value)
-            elif not hasattr(col, 'type'):
-                continue
-            elif col.type.python_type == date:
-                rv[col_name] = self.date_factory(value)
-            elif col.type.python_type == time:
-                rv[col_name] = time(*[int(x) for x in value.split(':')])
-            elif col.type.python_type == datetime:
-                rv[col_name] = self.datetime_factory(value)
-            elif col.type.python_type == timedelta:
-                duration, unit = value.split(" ")
-                rv[col_name] = timedelta(**{unit: float(duration)})
+            elif converter is not None:
+                rv[col_name] = converter(value)
         return rv
 
+    def _get_converter(self,
+                       class_name: str,
+                       col_name: str,
+                       ) -> Union[Callable[[Any], Any], object, None]:
+        """
+        Determine how to convert the values of a column, for the conversion
+        plan of a model class: either a function taking the value to convert,
+        ``_RELATIONSHIP`` for relationships, or None if the values get used as-is.
+        """
+        col = getattr(self.models[class_name], col_name)
+        if col_name in self.get_relationships(class_name):
+            return _RELATIONSHIP
+        elif not hasattr(col, 'type'):
+            return None
+
+        try:
+            python_type = col.type.python_type
+        except NotImplementedError:
+            return None
+
+        format = self.date_formats.get('{}.{}'.format(class_name, col_name))
+        if python_type == date:
+            return partial(self.date_factory, format=format) if format else self.date_factory
+        elif python_type == time:
+            return _to_time
+        elif python_type == datetime:
+            return (partial(self.datetime_factory, format=format) if format
+                    else self.datetime_factory)
+        elif python_type == timedelta:
+            return _to_timedelta
+        return None
+
     def commit(self):
         self.session.commit()
+        self._unflushed = self._uncommitted = 0
+
+    def rollback(self):
+        self.session.rollback()
+        self.model_instances.clear()
+        self._unflushed = self._uncommitted = 0
+
+    @contextmanager
+    def count_statements(self, callback: Callable[[], None]):
+        bind = self.session.get_bind()
+        listener = lambda *args, **kwargs: callback()
+        sa.event.listen(bind, 'before_cursor_execute', listener)
+        try:
+            yield
+        finally:
+            sa.event.remove(bind, 'before_cursor_execute', listener)
+
+
+def _attr_key(mapper: sa_orm.Mapper, column: sa.Column) -> str:
+    """
+    Get the mapped attribute name for the given column.
+    """
+    return mapper.get_property_by_column(column).key
+
+
+def _coerce_lookup_value(column: Optional[sa.Column], value: Any) -> Any:
+    """
+    Convert a value from the fixtures to the python type of the given column,
+    if that's possible without losing information (eg ``123`` to ``'123'``
+    for a String column). Returns ``_QUERY`` if it isn't.
+    """
+    try:
+        python_type = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return value
+    if isinstance(value, python_type):
+        return value
+    elif (python_type in {int, str} and isinstance(value, (int, str))
+            and not isinstance(value, bool)):
+        try:
+            converted = python_type(value)
+        except ValueError:
+            return _QUERY
+        # eg '007' isn't the same as 7
+        if type(value)(converted) == value:
+            return converted
+    return _QUERY
+
+
+def _to_time(value: str) -> time:
+    return time(*[int(x) for x in value.split(':')])
+
+
+def _to_timedelta(value: str) -> timedelta:
+    duration, unit = value.split(" ")
+    return timedelta(**{unit: float(duration)})
+
+
+def _pk_keys(mapper: sa_orm.Mapper) -> List[str]:
+    return [_attr_key(mapper, col) for col in mapper.primary_key]
@@ -0,0 +1,118 @@
+import asyncio
+import weakref
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import FunctionType
+from typing import *
+
+import sqlalchemy as sa
+
+from sqlalchemy import orm as sa_orm
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from ..types import Identifier
+from .sqlalchemy import SQLAlchemyModelFactory
+
+
+class AsyncSQLAlchemyModelFactory(SQLAlchemyModelFactory):
+    """
+    Concrete factory for the SQLAlchemy ORM's asyncio extension (SQLAlchemy
+    1.4+), for use with :meth:`FixturesLoader.create_all_async`.
+
+    The models for each model class get written with a new
+    :class:`~sqlalchemy.ext.asyncio.AsyncSession`, which gets committed once
+    the class is done, so that the classes which don't depend upon each other
+    can be written concurrently (over separate connections from the engine's
+    pool). Note that the classes written so far stay committed if a later one
+    fails.
+    """
+
+    def __init__(self,
+                 engine: AsyncEngine,
+                 models: Union[List[type], Dict[str, type]],
+                 date_factory: Optional[FunctionType] = None,
+                 datetime_factory: Optional[FunctionType] = None,
+                 date_formats: Optional[Dict[str, str]] = None,
+                 bulk: bool = False,
+                 batch_size: Optional[int] = None,
+                 commit_every: Optional[int] = None,
+                 concurrency: Optional[int] = None):
+        """
+        :param engine: the sqlalchemy async engine
+        :param concurrency: the maximum number of model classes to write at
+            once (defaults to the size of the engine's connection pool)
+
+        The other parameters are the same as for :class:`SQLAlchemyModelFactory`.
+        The sessions get created with ``expire_on_commit=False``, so that the
+        attributes of the returned model instances can still be accessed.
+        """
+        # the session of the current task (see run_sync)
+        self._session: ContextVar[Optional[sa_orm.Session]] = ContextVar(
+            'session', default=None)
+
+        super().__init__(None, models, date_factory=date_factory,
+                         datetime_factory=datetime_factory, date_formats=date_formats,
+                         bulk=bulk, batch_size=batch_size, commit_every=commit_every)
+        self.engine = engine
+        self.concurrency = concurrency or getattr(engine.pool, 'size', lambda: 1)()
+        self._semaphores = weakref.WeakKeyDictionary()  # by event loop
+
+    @property
+    def session(self) -> Optional[sa_orm.Session]:
+        """
+        The (sync) session of the model class currently being written.
+        """
+        return self._session.get()
+
+    @session.setter
+    def session(self, session: Optional[sa_orm.Session]):
+        self._session.set(session)
+
+    async def run_sync(self, fn: Callable[..., Any], *args) -> Any:
+        semaphore = self._semaphores.setdefault(asyncio.get_running_loop(),
+                                                asyncio.Semaphore(self.concurrency))
+        async with semaphore:
+            async with AsyncSession(self.engine, expire_on_commit=False) as session:
+                rv = await session.run_sync(self._run_sync, fn, *args)
+                await session.commit()
+        return rv
+
+    def _run_sync(self, session: sa_orm.Session, fn: Callable[..., Any], *args) -> Any:
+        token = self._session.set(session)
+        try:
+            return fn(*args)
+        finally:
+            self._session.reset(token)
+
+    def update_relationships(self,
+                             class_name: str,
+                             rows: List[Tuple[Identifier, Dict[str, Any]]],
+                             ):
+        # the models were released when the session they were created with
+        # got committed, so get references to them in the current session
+        instances = self.model_instances[class_name]
+        for identifier, _ in rows:
+            if identifier.key not in instances:
+                instances[identifier.key] = self.get_reference(identifier)
+        super().update_relationships(class_name, rows)
+
+    def commit(self):
+        # the sessions get committed by run_sync
+        if self.session is not None:
+            super().commit()
+
+    def rollback(self):
+        # the sessions get rolled back by run_sync
+        self.model_instances.clear()
+        self._unflushed = self._uncommitted = 0
+
+    @contextmanager
+    def count_statements(self, callback: Callable[[], None]):
+        bind = self.engine.sync_engine
+        listener = lambda *args, **kwargs: callback()
+        sa.event.listen(bind, 'before_cursor_execute', listener)
+        try:
+            yield
+        finally:
+            sa.event.remove(bind, 'before_cursor_execute', listener)
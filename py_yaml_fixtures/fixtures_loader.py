@@ -1,10 +1,16 @@
-import contextlib
+import asyncio
+import fnmatch
 import jinja2
-import networkx as nx
+import multiprocessing
 import os
+import random
+import re
 import yaml
+import zlib
 
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from faker import Faker
 from typing import *
 
@@ -13,12 +19,26 @@ try:
 except ImportError:
     hash_password = lambda x: x
 
+from .cache import RenderCache, TemplateBytecodeCache
 from .factories import FactoryInterface
+from .manifest import Manifest
+from .snapshot import Snapshot
+from .stats import LoaderStats, Timing
 from .types import Identifier
-from .utils import normalize_identifiers, random_model, random_models
+from .utils import (CircularDependencyError, normalize_identifiers,
+                    normalize_identifiers_bulk, random_model, random_models,
+                    topological_levels, topological_sort)
 
 
 MULTI_CLASS_FILENAMES = {'fixtures.yml', 'fixtures.yaml'}
+FIXTURE_FILE_EXTENSIONS = {'.yml', '.yaml'}
+FAKER_SEED = 1234
+
+# the (unindented) keys of multi-class files, ie the model class names
+_TOP_LEVEL_KEY_RE = re.compile(r'^([A-Za-z_]\w*)[ \t]*:', re.MULTILINE)
+
+# use the (much faster) libyaml-based loader if it's available
+DEFAULT_YAML_LOADER = getattr(yaml, 'CFullLoader', yaml.FullLoader)
 
 
 class FixturesLoader:
@@ -29,18 +49,77 @@ class FixturesLoader:
 
     :param factory: An instance of the concrete factory to use for creating models
     :param fixture_dirs: A list of directory paths to load fixtures templates from
+    :param recursive: Whether to also load the fixture files in subdirectories
+                      of the ``fixture_dirs``
+    :param include: An optional list of glob patterns for the paths (relative
+                    to their fixtures directory, with ``/`` as the separator)
+                    of the fixture files to load. By default every ``.yml``
+                    and ``.yaml`` file is loaded.
+    :param exclude: An optional list of glob patterns for the paths of files
+                    (or subdirectories) not to load
     :param env: An optional jinja environment (the default one will include
                 faker as a template global, but if you want to customize its
                 tags/filters/etc, then you need to create an env yourself - the
                 correct loader will be set automatically for you)
+    :param workers: An optional number of worker processes to render and parse
+                    the fixture files with (only supported on platforms where
+                    processes can be forked, otherwise the files are rendered
+                    serially)
+    :param seed: The root seed for rendering the templates. Each file gets
+                 rendered with faker (unless you add your own faker to the
+                 ``env``) and a ``random.Random`` seeded from it and the
+                 file's :meth:`template_name`, so that the output doesn't
+                 depend upon the order (or the process) the files get
+                 rendered in. The ``random_model`` and ``random_models``
+                 helpers and the ``random`` filter use the file's
+                 ``random.Random``.
+    :param yaml_loader: An optional PyYAML ``Loader`` class to parse the rendered
+                        templates with (defaults to ``yaml.CFullLoader`` if
+                        PyYAML was built with libyaml, or ``yaml.FullLoader``
+                        otherwise)
+    :param cache_dir: An optional directory to cache the rendered and parsed
+                      fixture files in. Unchanged files get loaded from the
+                      cache instead of being rendered again. (Only the template
+                      source, its name, the seed and the yaml loader
+                      are part of the cache key, so you shouldn't use this if
+                      your templates depend on anything else.)
+    :param cache_max_size: The maximum size of the cache directory, in bytes
+    :param bytecode_cache_dir: An optional directory to cache the compiled
+                               templates in (see
+                               :class:`~py_yaml_fixtures.cache.TemplateBytecodeCache`),
+                               so that other processes (and later runs) don't
+                               need to compile them again
+    :param manifest_path: An optional path to a manifest file, to enable
+                          incremental loading: only the identifiers whose
+                          fixture data changed since the last load (along with
+                          new ones, and the ones referring to either) get
+                          written to the database (see :meth:`create_all`)
+    :param stats: An optional :class:`~py_yaml_fixtures.stats.LoaderStats`
+                  instance to collect timings, row counts and SQL statement
+                  counts in (for profiling)
     """
 
     def __init__(self,
                  factory: FactoryInterface,
                  fixture_dirs: List[str],
-                 env: Optional[jinja2.Environment] = None):
+                 env: Optional[jinja2.Environment] = None,
+                 recursive: bool = False,
+                 include: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None,
+                 workers: Optional[int] = None,
+                 seed: int = FAKER_SEED,
+                 yaml_loader: Optional[type] = None,
+                 cache_dir: Optional[str] = None,
+                 cache_max_size: int = 100 * 1024 * 1024,
+                 bytecode_cache_dir: Optional[str] = None,
+                 manifest_path: Optional[str] = None,
+                 stats: Optional[LoaderStats] = None):
+        self._faker = None
+        self._default_loader = False
         self.env = self._ensure_env(env)
         """The Jinja Environment used for rendering the yaml template files."""
+        if bytecode_cache_dir:
+            self.env.bytecode_cache = TemplateBytecodeCache(bytecode_cache_dir)
 
         factory.loader = self
         self.factory = factory
@@ -49,17 +128,59 @@ class FixturesLoader:
         self.fixture_dirs = fixture_dirs
         """A list of directories where fixture files should be loaded from."""
 
+        self.recursive = recursive
+        """Whether to load fixture files from subdirectories of :attr:`fixture_dirs`."""
+
+        self.include = include
+        """Glob patterns for the relative paths of the fixture files to load."""
+
+        self.exclude = exclude
+        """Glob patterns for the relative paths of the fixture files not to load."""
+
+        self.workers = workers
+        """The number of worker processes to render the fixture files with."""
+
+        self.seed = seed
+        """The root seed for rendering the templates."""
+
+        self.yaml_loader = yaml_loader or DEFAULT_YAML_LOADER
+        """The PyYAML Loader class used for parsing the rendered templates."""
+
+        self.cache = RenderCache(cache_dir, cache_max_size) if cache_dir else None
+        """The cache of rendered and parsed fixture files, if enabled."""
+
+        self.manifest = Manifest(manifest_path) if manifest_path else None
+        """The manifest of the last load, if incremental loading is enabled."""
+
+        self.stats = stats
+        """The collected profiling stats, if enabled."""
+
         self.relationships = {}
         """A dict keyed by model name where values are a list of related model names."""
 
         self.model_fixtures = defaultdict(dict)
         """A dict of models names to their semi-processed data from the yaml files."""
 
+        self.identifier_graph = {}
+        """
+        The dependency graph between identifiers: a dict keyed by
+        :class:`Identifier`, where the values are dicts of relationship column
+        names to the list of Identifiers they refer to.
+        """
+
         self._file_cache = {}
-        self._data_cache = defaultdict(dict)
+        self._data_cache = {}
+        self._filepaths = None
+        self._class_index = None
+        self._template_names = {}
+        self._template_paths = {}
+        self._partial = False
         self._loaded = False
 
-    def create_all(self, progress_callback: Optional[callable] = None) -> Dict[str, object]:
+    def create_all(self,
+                   progress_callback: Optional[callable] = None,
+                   only: Optional[Iterable[str]] = None,
+                   ) -> Dict[str, object]:
         """
         Creates all the models discovered from fixture files in :attr:`fixtures_dir`.
 
@@ -68,40 +189,402 @@ class FixturesLoader:
                                 - an :class:`Identifier`
                                 - the model instance
                                 - and a boolean specifying whether the model was created
+        :param only: An optional list of model class names to create the models
+                     of, along with the models they refer to (recursively).
+                     Only the fixture files defining those model classes get
+                     rendered (see :attr:`class_index`).
         :return: A dictionary keyed by identifier where the values are model instances.
+
+        When incremental loading is enabled (see ``manifest_path``), only the
+        identifiers that are new, whose fixture data changed since the last
+        load, or that refer to any of those get written (and returned). The
+        rest get looked up by their primary key from the manifest, so the
+        manifest should be deleted if the database gets reset.
         """
-        if not self._loaded:
-            self._load_data()
+        rv = {}
+        for identifier, model_instance, created in self._iter_create(False, only):
+            if progress_callback:
+                progress_callback(identifier, model_instance, created)
+            rv[identifier.key] = model_instance
+        return rv
+
+    def iter_create(self,
+                    only: Optional[Iterable[str]] = None,
+                    ) -> Iterator[Tuple[Identifier, object, bool]]:
+        """
+        Like :meth:`create_all`, except that it yields a three-tuple of
+        :class:`Identifier`, model instance and whether or not it was created
+        for each model, instead of building up a dictionary of all of them.
+
+        Once all the models for a model class have been created, the factory
+        is asked to release them (see :meth:`FactoryInterface.release`), along
+        with the loaded fixture data for them, keeping only their primary keys
+        to resolve references from the models created later. This keeps the
+        memory usage bounded for large fixture sets. The generator must be
+        exhausted for the changes to be committed.
+        """
+        return self._iter_create(True, only)
+
+    def _iter_create(self,
+                     release: bool,
+                     only: Optional[Iterable[str]] = None,
+                     ) -> Iterator[Tuple[Identifier, object, bool]]:
+        if only is not None or not self._loaded:
+            self._load_data(only)
 
-        # build up a directed acyclic graph to determine the model instantiation order
-        dag = nx.DiGraph()
-        for model_class_name, dependencies in self.relationships.items():
-            dag.add_node(model_class_name)
-            for dep in dependencies:
-                dag.add_edge(model_class_name, dep)
+        # the primary keys of the written rows are needed for the manifest
+        release = release or bool(self.manifest)
 
-        try:
-            creation_order = reversed(list(nx.topological_sort(dag)))
-        except nx.NetworkXUnfeasible:
-            raise Exception('Circular dependency detected between models: ' +
-                            ', '.join('{a} -> {b}'.format(a=a, b=b)
-                                      for a, b in nx.find_cycle(dag)))
+        if not self.stats:
+            yield from self._create(release)
+            return
+
+        with self.factory.count_statements(self.stats.count_statement):
+            yield from self._create(release)
+
+    def _create(self, release: bool) -> Iterator[Tuple[Identifier, object, bool]]:
+        with self._measure('sort'):
+            creation_order, deferred_columns = self._resolve_creation_order()
+
+        hashes = self._apply_manifest() if self.manifest else None
 
         # create or update the models in the determined order
-        rv = {}
         for model_class_name in creation_order:
-            for identifier_key, data in self.model_fixtures[model_class_name].items():
-                identifier = Identifier(model_class_name, identifier_key)
+            if not self.model_fixtures.get(model_class_name):
+                continue
+
+            deferred = deferred_columns.get(model_class_name)
+            yield from self._write(model_class_name, deferred)
+
+            # the models with deferred columns get released after they're updated
+            if release and not deferred:
+                with self._measure('write', model_class_name):
+                    self._release(model_class_name)
+
+        # now that all the models exist, set the relationships that were
+        # deferred to break circular dependencies
+        for model_class_name in creation_order:
+            deferred = deferred_columns.get(model_class_name)
+            if deferred:
+                self._write_deferred(model_class_name, deferred, release)
+
+        with self._measure('commit'):
+            self.factory.commit()
+        self._save_manifest(hashes)
+        if release:
+            # the loaded data was consumed
+            self._loaded = False
+
+    async def create_all_async(self,
+                               progress_callback: Optional[callable] = None,
+                               only: Optional[Iterable[str]] = None,
+                               ) -> Dict[str, object]:
+        """
+        Like :meth:`create_all`, for use with factories that have an asyncio
+        API (eg :class:`~py_yaml_fixtures.factories.sqlalchemy_async.AsyncSQLAlchemyModelFactory`).
+
+        The model classes get created one level of the dependency graph at a
+        time, and the classes within a level (which don't depend upon each
+        other) get created concurrently, each with a separate call to
+        :meth:`FactoryInterface.run_sync`. The models get released once
+        their class is done, like with :meth:`iter_create`. (When profiling,
+        note that the timings of concurrently created classes overlap.)
+        """
+        if only is not None or not self._loaded:
+            self._load_data(only)
+
+        if not self.stats:
+            return await self._create_async(progress_callback)
+
+        with self.factory.count_statements(self.stats.count_statement):
+            return await self._create_async(progress_callback)
+
+    async def _create_async(self,
+                            progress_callback: Optional[callable],
+                            ) -> Dict[str, object]:
+        with self._measure('sort'):
+            levels, deferred_columns = self._resolve_creation_order(levels=True)
+
+        hashes = self._apply_manifest() if self.manifest else None
+
+        def create(class_name: str):
+            deferred = deferred_columns.get(class_name)
+            results = self._write(class_name, deferred)
+            with self._measure('write', class_name):
+                # the fixtures of models with deferred columns are still needed
+                self._release(class_name, keep_fixtures=bool(deferred))
+            return results
+
+        rv = {}
+        for level in levels:
+            level = [class_name for class_name in level
+                     if self.model_fixtures.get(class_name)]
+            for results in await asyncio.gather(*[
+                    self.factory.run_sync(create, class_name) for class_name in level]):
+                for identifier, model_instance, created in results:
+                    if progress_callback:
+                        progress_callback(identifier, model_instance, created)
+                    rv[identifier.key] = model_instance
+
+        await asyncio.gather(*[
+            self.factory.run_sync(self._write_deferred, class_name, deferred, True)
+            for class_name, deferred in deferred_columns.items()
+            if deferred and self.model_fixtures.get(class_name)])
+
+        with self._measure('commit'):
+            self.factory.commit()
+        self._save_manifest(hashes)
+        self._loaded = False
+        return rv
+
+    def _write(self,
+               class_name: str,
+               deferred: Optional[Set[str]],
+               ) -> List[Tuple[Identifier, object, bool]]:
+        """
+        Create or update the models for the given class, except for their
+        deferred columns.
+        """
+        rows = []
+        with self._measure('convert', class_name) as timing:
+            for identifier_key, data in self.model_fixtures[class_name].items():
+                identifier = Identifier(class_name, identifier_key)
+                if deferred:
+                    data = {k: v for k, v in data.items() if k not in deferred}
                 data = self.factory.maybe_convert_values(identifier, data)
-                self._data_cache[model_class_name][identifier_key] = data
+                self._data_cache[identifier] = data
+                rows.append((identifier, data))
+            timing.rows += len(rows)
+
+        with self._measure('write', class_name) as timing:
+            results = self.factory.bulk_create_or_update(class_name, rows)
+            timing.rows += len(rows)
+        return [(identifier, model_instance, created)
+                for (identifier, _), (model_instance, created) in zip(rows, results)]
+
+    def _write_deferred(self, class_name: str, deferred: Set[str], release: bool):
+        """
+        Set the deferred columns of the models for the given class.
+        """
+        with self._measure('relationships', class_name) as timing:
+            rows = []
+            for identifier_key, data in self.model_fixtures[class_name].items():
+                values = {k: v for k, v in data.items() if k in deferred}
+                if values:
+                    identifier = Identifier(class_name, identifier_key)
+                    rows.append((identifier,
+                                 self.factory.maybe_convert_values(identifier, values)))
+            if rows:
+                self.factory.update_relationships(class_name, rows)
+            if release:
+                self._release(class_name)
+            timing.rows += len(rows)
+
+    def _save_manifest(self, hashes: Optional[Dict[Identifier, str]]):
+        if not self.manifest:
+            return
+
+        # keep the state of the identifiers that weren't selected
+        if not self._partial:
+            self.manifest.hashes, self.manifest.primary_keys = {}, {}
+        self.manifest.hashes.update(hashes)
+        self.manifest.primary_keys.update({
+            identifier: self.factory.primary_keys[identifier]
+            for identifier in hashes if identifier in self.factory.primary_keys})
+        self.manifest.save()
+
+    def create_snapshot(self, path: str) -> Snapshot:
+        """
+        Create all the models (like :meth:`iter_create`), and then save a
+        snapshot of the tables of their model classes (see
+        :meth:`FactoryInterface.dump_tables`), along with the primary key of
+        every identifier, to the given path. Restoring the snapshot with
+        :meth:`restore_snapshot` is much faster than loading the fixtures again.
 
-                model_instance, created = self.factory.create_or_update(identifier, data)
-                if progress_callback:
-                    progress_callback(identifier, model_instance, created)
-                rv[identifier_key] = model_instance
+        :param path: The path of the snapshot file
+        :return: The snapshot
+        """
+        snapshot = Snapshot(path)
+        snapshot.fingerprint = self.fingerprint()
+        if not self._loaded:
+            self._load_data()
+        creation_order, _ = self._resolve_creation_order()
+        for _ in self._iter_create(release=True):
+            pass
+
+        snapshot.tables = self.factory.dump_tables(creation_order)
+        snapshot.primary_keys = dict(self.factory.primary_keys)
+        snapshot.save()
+        return snapshot
+
+    def restore_snapshot(self, snapshot: Union[str, Snapshot]) -> Dict[Identifier, Any]:
+        """
+        Restore a snapshot created by :meth:`create_snapshot`, replacing all of
+        the rows in its tables (see :meth:`FactoryInterface.restore_tables`),
+        and commit.
 
+        :param snapshot: The snapshot, or the path of its file
+        :return: The primary key of the row of every identifier (which are
+                 also handed to the factory, so that identifiers get resolved
+                 with :meth:`FactoryInterface.get_reference` afterwards)
+        """
+        if isinstance(snapshot, str):
+            snapshot = Snapshot(snapshot)
+            snapshot.load()
+            if snapshot.fingerprint is None:
+                raise ValueError('No snapshot found at {!r}'.format(snapshot.path))
+
+        self.factory.restore_tables(snapshot.tables)
         self.factory.commit()
-        return rv
+        self.factory.primary_keys.update(snapshot.primary_keys)
+        return dict(snapshot.primary_keys)
+
+    def fingerprint(self) -> str:
+        """
+        A hash of the fixture files (their paths and template sources) and of
+        the options that affect how they get rendered, to tell whether a
+        snapshot is up to date. (Like with ``cache_dir``, anything else the
+        templates depend upon isn't part of it.)
+        """
+        return RenderCache.make_key(self.yaml_loader.__name__, *[
+            part for filepath in self.find_fixture_files()
+            for part in (self.template_name(filepath), self._read_file(filepath),
+                         self._file_seed(filepath))])
+
+    def reset(self):
+        """
+        Forget the loaded fixture data, so that the next call to
+        :meth:`create_all` or :meth:`iter_create` reads the fixture files
+        again (eg after they changed). The jinja environment (and its compiled
+        templates) and the factory are kept.
+        """
+        self.relationships = {}
+        self.model_fixtures = defaultdict(dict)
+        self.identifier_graph = {}
+        self._file_cache = {}
+        self._data_cache = {}
+        self._filepaths = None
+        self._class_index = None
+        self._template_names = {}
+        self._template_paths = {}
+        self._partial = False
+        self._loaded = False
+        self.factory.primary_keys.clear()
+
+    def _apply_manifest(self) -> Dict[Identifier, str]:
+        """
+        Compare the loaded fixture data with the manifest of the last load,
+        removing the unchanged identifiers from :attr:`model_fixtures` (their
+        primary keys get handed to the factory, so that references to them
+        can still be resolved).
+
+        :return: The content hash of every identifier's fixture data
+        """
+        self.manifest.load()
+        hashes = {}
+        changed = set()
+        for class_name, class_fixtures in self.model_fixtures.items():
+            for identifier_key, data in class_fixtures.items():
+                identifier = Identifier(class_name, identifier_key)
+                hashes[identifier] = self.manifest.hash(data)
+                if (hashes[identifier] != self.manifest.hashes.get(identifier)
+                        or identifier not in self.manifest.primary_keys):
+                    changed.add(identifier)
+
+        # the identifiers that (indirectly) refer to changed ones need to be
+        # written again too: a changed row that gets looked up by its values
+        # ends up as a new row, and so do the rows referring to it
+        dependents = defaultdict(set)
+        for identifier, columns in self.identifier_graph.items():
+            for dependencies in columns.values():
+                for dependency in dependencies:
+                    dependents[dependency].add(identifier)
+
+        dirty = set(changed)
+        stack = list(changed)
+        while stack:
+            for identifier in dependents.pop(stack.pop(), ()):
+                if identifier not in dirty:
+                    dirty.add(identifier)
+                    stack.append(identifier)
+
+        for identifier in hashes:
+            if identifier not in dirty:
+                del self.model_fixtures[identifier.class_name][identifier.key]
+                self.factory.primary_keys[identifier] = \
+                    self.manifest.primary_keys[identifier]
+        return hashes
+
+    @contextmanager
+    def _measure(self, phase: str, name: Optional[str] = None) -> Iterator[Timing]:
+        """
+        Measure the block with :attr:`stats`, if enabled.
+        """
+        if not self.stats:
+            yield Timing()
+            return
+
+        with self.stats.measure(phase, name) as timing:
+            yield timing
+
+    def _release(self, class_name: str, keep_fixtures: bool = False):
+        """
+        Release the models (and their loaded data) for the given class.
+        """
+        self.factory.release(class_name)
+        class_fixtures = (self.model_fixtures.get(class_name, {}) if keep_fixtures
+                          else self.model_fixtures.pop(class_name, {}))
+        for identifier_key in class_fixtures:
+            identifier = Identifier(class_name, identifier_key)
+            if identifier in self.factory.primary_keys:
+                self._data_cache.pop(identifier, None)
+
+    def _resolve_creation_order(self, levels: bool = False,
+                                ) -> Tuple[List[str], Dict[str, Set[str]]]:
+        """
+        Determine the order to create the model classes in (dependencies
+        first). Circular dependencies (including self-referential ones) get
+        broken by deferring relationship columns the factory allows to be
+        left unset on insert, which then get set after all models exist.
+
+        :param levels: Whether to group the model class names into levels of
+                       classes that don't depend upon each other (see
+                       :func:`~py_yaml_fixtures.utils.topological_levels`)
+        :return: A two-tuple of the list of model class names in creation
+                 order (or of levels), and a dict of model class names to
+                 deferred columns
+        """
+        sort = topological_levels if levels else topological_sort
+        # model class name -> dependency model class name -> columns
+        class_dependencies = defaultdict(lambda: defaultdict(set))
+        for class_name in self.relationships:
+            class_dependencies[class_name]  # make sure every model is included
+        for identifier, columns in self.identifier_graph.items():
+            for column, dependencies in columns.items():
+                for dependency in dependencies:
+                    class_dependencies[identifier.class_name][dependency.class_name].add(
+                        column)
+
+        deferred_columns = defaultdict(set)
+        while True:
+            graph = {class_name: [dep for dep, columns in dependencies.items()
+                                  if not columns <= deferred_columns[class_name]]
+                     for class_name, dependencies in class_dependencies.items()}
+            try:
+                return sort(graph), deferred_columns
+            except CircularDependencyError as e:
+                cycle = e.cycle
+
+            for class_name, dependency in zip(cycle, cycle[1:]):
+                columns = class_dependencies[class_name][dependency]
+                if all(self.factory.can_defer(class_name, col) for col in columns):
+                    deferred_columns[class_name].update(columns)
+                    break
+            else:
+                raise CircularDependencyError(
+                    cycle, 'Circular dependency detected between models: ' +
+                    ', '.join('{a} -> {b}'.format(a=a, b=b)
+                              for a, b in zip(cycle, cycle[1:])))
 
     def convert_identifiers(self, identifiers: Union[Identifier, List[Identifier]]):
         """
@@ -112,7 +595,10 @@ class FixturesLoader:
             return identifiers
 
         def _create_or_update(identifier):
-            data = self._data_cache[identifier.class_name][identifier.key]
+            if identifier not in self._data_cache:
+                # the model was already released
+                return self.factory.get_reference(identifier)
+            data = self._data_cache[identifier]
             return self.factory.create_or_update(identifier, data)[0]
 
         if isinstance(identifiers, Identifier):
@@ -122,71 +608,334 @@ class FixturesLoader:
         else:
             raise TypeError('`identifiers` must be an Identifier or list of Identifiers.')
 
-    def _load_data(self):
+    def _load_data(self, only: Optional[Iterable[str]] = None):
         """
-        Load all fixtures from :attr:`fixtures_dir`
+        Load all fixtures from :attr:`fixtures_dir` (or only the ones needed
+        to create the models of the given classes)
         """
-        filepaths = []
+        # render and parse every fixture file exactly once. calls to random_model
+        # and random_models get replaced with placeholders, because we can't know
+        # all of the model identifier keys until every file is parsed
+        if only is None:
+            filepaths = self.find_fixture_files()
+            rendered = self._render_all(filepaths)
+        else:
+            filepaths, rendered = self._render_dependencies(only)
         model_identifiers = defaultdict(list)
+        for data, deferred in rendered:
+            for class_name, class_data in data.items():
+                model_identifiers[class_name].extend(class_data.keys())
+
+        # now that all the model identifier keys are known, we can resolve the
+        # placeholders (allows random_model and random_models to work)
+        for filepath, (data, deferred) in zip(filepaths, rendered):
+            with self._measure('load', filepath) as timing:
+                deferred.resolve(data, model_identifiers, self.yaml_loader)
+                self._load_from_data(data)
+                timing.rows += _count_rows(data)
+
+        self._partial = only is not None
+        if self._partial:
+            self._select(only)
+        # the selected data can't be reused for creating all of the models
+        self._loaded = not self._partial
+
+    def _render_dependencies(self, class_names: Iterable[str],
+                             ) -> Tuple[List[str], List[Tuple[Dict[str, Dict[str, Any]],
+                                                              '_DeferredRandomModels']]]:
+        """
+        Render and parse the fixture files defining the given model classes,
+        along with the files of the model classes they refer to (recursively,
+        including the classes passed to ``random_model(s)``).
+
+        :return: A two-tuple of the list of file paths (in load order), and
+                 the list of their rendered results
+        """
+        class_names = list(class_names)
+        for class_name in class_names:
+            if class_name not in self.class_index:
+                raise ValueError('No fixtures found for the {!r} model class'.format(
+                    class_name))
+
+        rv = {}
+        seen = set()
+        while class_names:
+            seen.update(class_names)
+            filepaths = list(dict.fromkeys(
+                filepath for class_name in class_names
+                for filepath in self.class_index.get(class_name, [])
+                if filepath not in rv))
+            class_names = set()
+            for filepath, (data, deferred) in zip(filepaths, self._render_all(filepaths)):
+                rv[filepath] = data, deferred
+                class_names.update(self._find_references(data, deferred) - seen)
+
+        filepaths = [filepath for filepath in self.find_fixture_files() if filepath in rv]
+        return filepaths, [rv[filepath] for filepath in filepaths]
+
+    def _find_references(self,
+                         data: Dict[str, Dict[str, Any]],
+                         deferred: '_DeferredRandomModels',
+                         ) -> Set[str]:
+        """
+        Find the names of the model classes referred to by the rendered data
+        of a fixture file.
+        """
+        rv = {args[0] for fn, args, kwargs in deferred.calls.values()}
+        for class_name, class_data in data.items():
+            relationship_columns = self.factory.get_relationships(class_name)
+            for identifier_data in (class_data or {}).values():
+                for col_name, value in (identifier_data or {}).items():
+                    if col_name not in relationship_columns or not value:
+                        continue
+                    # skip the random_model(s) placeholders
+                    elif isinstance(value, str) and value in deferred.calls:
+                        continue
+                    elif isinstance(value, list):
+                        value = [v for v in value
+                                 if not (isinstance(v, str) and v in deferred.calls)]
+                    rv.update(identifier.class_name
+                              for identifier in normalize_identifiers(value))
+        return rv
+
+    def _select(self, class_names: Iterable[str]):
+        """
+        Drop the loaded fixture data that isn't needed to create the models of
+        the given classes (and the models they refer to, recursively).
+        """
+        selected = set()
+        pending = [Identifier(class_name, identifier_key)
+                   for class_name in class_names
+                   for identifier_key in self.model_fixtures.get(class_name, {})]
+        while pending:
+            identifier = pending.pop()
+            if identifier in selected:
+                continue
+            selected.add(identifier)
+            for dependencies in self.identifier_graph.get(identifier, {}).values():
+                pending.extend(dependencies)
+
+        for class_name, class_fixtures in self.model_fixtures.items():
+            for identifier_key in [key for key in class_fixtures
+                                   if Identifier(class_name, key) not in selected]:
+                del class_fixtures[identifier_key]
+        self.identifier_graph = {identifier: columns
+                                 for identifier, columns in self.identifier_graph.items()
+                                 if identifier in selected}
 
-        # attempt to load fixture files from given directories (first pass)
-        # for each valid model fixture file, read it into the cache and get the
-        # list of identifier keys from it
+    def find_fixture_files(self, cached: bool = True) -> List[str]:
+        """
+        Find the fixture files in :attr:`fixture_dirs` (and their
+        subdirectories, if :attr:`recursive`), filtered by :attr:`include` and
+        :attr:`exclude`. The files of each directory are sorted by name. The
+        result is cached until :meth:`reset` gets called.
+
+        :param cached: Whether to use (and fill) the cache. Pass False to scan
+                       the directories again, without touching the cache
+                       (eg to watch for changes).
+        :return: The list of fixture file paths, in load order
+        """
+        if cached and self._filepaths is not None:
+            return self._filepaths
+
+        filepaths = []
         for fixtures_dir in self.fixture_dirs:
-            for filename in os.listdir(fixtures_dir):
-                filepath = os.path.join(fixtures_dir, filename)
-                file_ext = filename[filename.find('.')+1:]
-
-                # make sure it's a valid fixture file
-                if os.path.isfile(filepath) and file_ext in {'yml', 'yaml'}:
-                    filepaths.append(filepath)
-                    with open(filepath) as f:
-                        self._file_cache[filepath] = f.read()
-
-                    # preload to determine identifier keys
-                    with self._preloading_env() as env:
-                        rendered_yaml = env.get_template(filepath).render()
-                        data = yaml.load(rendered_yaml, Loader=yaml.FullLoader)
-                        if data:
-                            if filename.islower():
-                                for class_name in data:
-                                    model_identifiers[class_name] = list(
-                                        data[class_name].keys())
-                            else:
-                                class_name = filename[:filename.rfind('.')]
-                                model_identifiers[class_name] = list(data.keys())
-
-        # second pass where we can render the jinja templates with knowledge of all
-        # the model identifier keys (allows random_model and random_models to work)
-        for filepath in filepaths:
-            self._load_from_yaml(filepath, model_identifiers)
-
-        self._loaded = True
-
-    def _load_from_yaml(self, filepath: str, model_identifiers: Dict[str, List[str]]):
-        """
-        Load fixtures from the given filename
-        """
-        rendered_yaml = self.env.get_template(filepath).render(
-            model_identifiers=model_identifiers)
-        data = yaml.load(rendered_yaml, Loader=yaml.FullLoader)
-
-        identifier_data = {}
-        filename = os.path.basename(filepath)
-        if filename.islower():
-            for class_name in data:
-                d, self.relationships[class_name] = self._post_process_yaml_data(
-                    data[class_name], self.factory.get_relationships(class_name))
-                identifier_data[class_name] = d
+            self._scan_dir(fixtures_dir, '', filepaths)
+        if cached:
+            self._filepaths = filepaths
+        return filepaths
+
+    def _scan_dir(self, dirpath: str, relpath: str, filepaths: List[str]):
+        with os.scandir(dirpath) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+
+        for entry in entries:
+            entry_relpath = relpath + entry.name
+            if self.exclude and any(fnmatch.fnmatchcase(entry_relpath, pattern)
+                                    for pattern in self.exclude):
+                continue
+            elif entry.is_dir():
+                if self.recursive:
+                    self._scan_dir(entry.path, entry_relpath + '/', filepaths)
+            elif (entry.is_file()
+                    and os.path.splitext(entry.name)[1] in FIXTURE_FILE_EXTENSIONS
+                    and (not self.include
+                         or any(fnmatch.fnmatchcase(entry_relpath, pattern)
+                                for pattern in self.include))):
+                filepaths.append(entry.path)
+
+    @property
+    def class_index(self) -> Dict[str, List[str]]:
+        """
+        A dict of model class names to the paths of the fixture files that
+        define them (see :meth:`find_fixture_files`). Files named after a model
+        class don't need to be read to build it. Multi-class files get indexed
+        by their top-level keys (so classes whose names are generated by Jinja
+        tags are missing from the index).
+        """
+        if self._class_index is None:
+            self._class_index = defaultdict(list)
+            for filepath in self.find_fixture_files():
+                class_name = _get_class_name(os.path.basename(filepath))
+                class_names = ([class_name] if class_name else
+                               _TOP_LEVEL_KEY_RE.findall(self._read_file(filepath)))
+                for class_name in dict.fromkeys(class_names):
+                    self._class_index[class_name].append(filepath)
+        return self._class_index
+
+    def template_name(self, filepath: str) -> str:
+        """
+        The name of the template of the given fixture file: its path relative
+        to the fixture directory it's in, prefixed by the names of that
+        directory and of its parent (with ``/`` as the separator), eg
+        ``blog/fixtures/Article.yml``. Unlike the absolute path, the name
+        doesn't change when the fixture directories get moved, nor when other
+        fixture directories get loaded alongside, which keeps the compiled
+        templates (and any caches keyed by the name) valid.
+        """
+        if filepath not in self._template_names:
+            abspath = os.path.abspath(filepath)
+            name = filepath
+            # the deepest fixture dir, in case they're nested
+            for fixture_dir in sorted((os.path.abspath(fixture_dir)
+                                       for fixture_dir in self.fixture_dirs),
+                                      key=len, reverse=True):
+                if abspath.startswith(os.path.join(fixture_dir, '')):
+                    parent, dirname = os.path.split(fixture_dir)
+                    name = '/'.join([os.path.basename(parent), dirname,
+                                     os.path.relpath(abspath, fixture_dir)])
+                    break
+            self._template_names[filepath] = name.replace(os.sep, '/')
+        return self._template_names[filepath]
+
+    def _jinja_name(self, filepath: str) -> str:
+        """
+        The name to load the given file's template from the jinja env with:
+        its :meth:`template_name`, unless another fixture directory has the
+        same names (eg ``app/fixtures`` in two different places), in which
+        case the file path.
+        """
+        name = self.template_name(filepath)
+        if self._template_paths.setdefault(name, filepath) != filepath:
+            return filepath
+        return name
+
+    def _read_file(self, filepath: str) -> str:
+        if filepath not in self._file_cache:
+            with open(filepath) as f:
+                self._file_cache[filepath] = f.read()
+        return self._file_cache[filepath]
+
+    def _render_all(self, filepaths: List[str],
+                    ) -> List[Tuple[Dict[str, Dict[str, Any]], '_DeferredRandomModels']]:
+        """
+        Render and parse the given fixture files, in worker processes if
+        :attr:`workers` is set. The results are always in the same order as
+        ``filepaths``.
+        """
+        global _worker_loader
+
+        rv = {}
+        cache_keys = {}
+        if self.cache:
+            for filepath in filepaths:
+                cache_keys[filepath] = self.cache.make_key(
+                    self._read_file(filepath), self.template_name(filepath),
+                    self._file_seed(filepath), self.yaml_loader.__name__)
+                with self._measure('cache', filepath) as timing:
+                    cached = self.cache.get(cache_keys[filepath])
+                    if cached is not None:
+                        rv[filepath] = cached
+                        timing.rows += _count_rows(cached[0])
+        filepaths_to_render = [x for x in filepaths if x not in rv]
+
+        if (not self.workers or self.workers < 2 or len(filepaths_to_render) < 2
+                or 'fork' not in multiprocessing.get_all_start_methods()):
+            rendered = [self._render_yaml(filepath) for filepath in filepaths_to_render]
         else:
-            class_name = filename[:filename.rfind('.')]
-            d, self.relationships[class_name] = self._post_process_yaml_data(
-                data, self.factory.get_relationships(class_name))
-            identifier_data[class_name] = d
+            # forked workers inherit the loader (and its jinja env), so that
+            # neither needs to be pickled
+            _worker_loader = self
+            try:
+                with ProcessPoolExecutor(max_workers=self.workers,
+                                         mp_context=multiprocessing.get_context('fork'),
+                                         ) as executor:
+                    rendered = list(executor.map(_render_in_worker, filepaths_to_render))
+            finally:
+                _worker_loader = None
 
-        for class_name, d in identifier_data.items():
+            # merge the stats measured by the workers
+            if self.stats:
+                for result, timings in rendered:
+                    for (phase, name), timing in timings.items():
+                        self.stats.add(phase, name, timing)
+            rendered = [result for result, timings in rendered]
+
+        for filepath, result in zip(filepaths_to_render, rendered):
+            if self.cache:
+                self.cache.set(cache_keys[filepath], result)
+            rv[filepath] = result
+        # scan the cache directory once, instead of after every entry
+        if self.cache and filepaths_to_render:
+            self.cache.evict()
+        return [rv[filepath] for filepath in filepaths]
+
+    def _render_yaml(self, filepath: str,
+                     ) -> Tuple[Dict[str, Dict[str, Any]], '_DeferredRandomModels']:
+        """
+        Render and parse the given fixture file, returning its data keyed by
+        model class name, along with the deferred random_model(s) calls.
+        """
+        # seed faker and random per file, so the output doesn't depend upon the
+        # order (or process) the files get rendered in. (reseeding doesn't
+        # forget the values faker.unique already returned for other files)
+        seed = self._file_seed(filepath)
+        if self._faker:
+            self._faker.seed_instance(seed)
+            self._faker.unique.clear()
+
+        deferred = _DeferredRandomModels(random.Random(seed))
+        # custom jinja loaders get the file paths, as they always have
+        name = self._jinja_name(filepath) if self._default_loader else filepath
+        with self._measure('render', filepath):
+            rendered_yaml = self.env.get_template(name).render(
+                **{_DeferredRandomModels.CONTEXT_KEY: deferred})
+        with self._measure('parse', filepath) as timing:
+            data = yaml.load(rendered_yaml, Loader=self.yaml_loader)
+            if not data:
+                return {}, deferred
+            class_name = _get_class_name(os.path.basename(filepath))
+            timing.rows += len(data) if class_name else _count_rows(data)
+
+        if not class_name:
+            return {class_name: class_data or {}
+                    for class_name, class_data in data.items()}, deferred
+        return {class_name: data}, deferred
+
+    def _file_seed(self, filepath: str) -> int:
+        """
+        The seed to use for faker and random when rendering the given file.
+        """
+        return self.seed + zlib.crc32(self.template_name(filepath).encode())
+
+    def _load_from_data(self, data: Dict[str, Dict[str, Any]]):
+        """
+        Load fixtures from the given (rendered) data, keyed by model class name
+        """
+        for class_name, class_data in data.items():
+            relationship_columns = self.factory.get_relationships(class_name)
+            d, relationships = self._post_process_yaml_data(
+                class_data, relationship_columns)
+            class_relationships = self.relationships.setdefault(class_name, [])
+            class_relationships.extend(x for x in relationships
+                                       if x not in class_relationships)
             for identifier_key, instance_data in d.items():
                 self.model_fixtures[class_name][identifier_key] = instance_data
+                self.identifier_graph[Identifier(class_name, identifier_key)] = {
+                    column: value if isinstance(value, list) else [value]
+                    for column, value in instance_data.items()
+                    if column in relationship_columns and value
+                }
 
     def _post_process_yaml_data(self,
                                 fixture_data: Dict[str, Dict[str, Any]],
@@ -201,14 +950,17 @@ class FixturesLoader:
         if not fixture_data:
             return rv, []
 
+        # collect the values of each relationship column, to normalize them in bulk
+        column_values = defaultdict(list)
         for identifier_id, data in fixture_data.items():
-            new_data = {}
+            new_data = rv[identifier_id] = dict(data)
             for col_name, value in data.items():
-                if col_name not in relationship_columns:
-                    new_data[col_name] = value
-                    continue
+                if col_name in relationship_columns:
+                    column_values[col_name].append((new_data, value))
 
-                identifiers = normalize_identifiers(value)
+        for col_name, rows in column_values.items():
+            normalized = normalize_identifiers_bulk([value for _, value in rows])
+            for (new_data, value), identifiers in zip(rows, normalized):
                 if identifiers:
                     relationships.add(identifiers[0].class_name)
 
@@ -216,10 +968,18 @@ class FixturesLoader:
                     new_data[col_name] = identifiers[0] if identifiers else None
                 else:
                     new_data[col_name] = identifiers
-
-            rv[identifier_id] = new_data
         return rv, list(relationships)
 
+    def _get_template_source(self, name: str) -> Tuple[str, str, Callable[[], bool]]:
+        """
+        The template loader function for the default jinja env loader, for
+        template names (see :meth:`template_name`) or file paths. Jinja caches
+        the compiled templates, so it needs to know when they changed.
+        """
+        path = self._template_paths.get(name, name)
+        source = self._read_file(path)
+        return source, path, lambda: self._file_cache.get(path) == source
+
     def _ensure_env(self, env: Union[jinja2.Environment, None]):
         """
         Make sure the jinja environment is minimally configured.
@@ -227,37 +987,121 @@ class FixturesLoader:
         if not env:
             env = jinja2.Environment()
         if not env.loader:
-            env.loader = jinja2.FunctionLoader(lambda path: self._file_cache[path])
+            env.loader = jinja2.FunctionLoader(self._get_template_source)
+            self._default_loader = True
 
         if 'faker' not in env.globals:
-            faker = Faker()
-            faker.seed_instance(1234)
-            env.globals['faker'] = faker
+            self._faker = Faker()
+            self._faker.seed_instance(FAKER_SEED)
+            env.globals['faker'] = self._faker
 
         env.globals.setdefault('hash_password', hash_password)
         if hasattr(jinja2, 'pass_context'):
-            env.globals.setdefault('random_model', jinja2.pass_context(random_model))
-            env.globals.setdefault('random_models', jinja2.pass_context(random_models))
+            env.globals['random_model'] = jinja2.pass_context(_deferred_random_model)
+            env.globals['random_models'] = jinja2.pass_context(_deferred_random_models)
+            random_filter = jinja2.pass_context(_random_filter)
         else:  # BC for jinja2 <3.x
-            env.globals.setdefault('random_model', jinja2.contextfunction(random_model))
-            env.globals.setdefault('random_models', jinja2.contextfunction(random_models))
+            env.globals['random_model'] = jinja2.contextfunction(_deferred_random_model)
+            env.globals['random_models'] = jinja2.contextfunction(_deferred_random_models)
+            random_filter = jinja2.contextfilter(_random_filter)
+
+        # replace jinja's random filter (but not a custom one)
+        if env.filters.get('random') is jinja2.filters.do_random:
+            env.filters['random'] = random_filter
 
         return env
 
-    @contextlib.contextmanager
-    def _preloading_env(self):
+
+_worker_loader = None  # type: Optional[FixturesLoader]
+
+
+def _render_in_worker(filepath: str):
+    if not _worker_loader.stats:
+        return _worker_loader._render_yaml(filepath), {}
+
+    # collect the stats for each file separately, to send them back to the parent
+    _worker_loader.stats = LoaderStats()
+    return _worker_loader._render_yaml(filepath), _worker_loader.stats.timings
+
+
+def _get_class_name(filename: str) -> Optional[str]:
+    """
+    The model class name of a fixture file named after one (the part of its
+    name before the first dot, eg ``User.yml`` or ``User.admins.yml``), or
+    None for (all lower case) multi-class files.
+    """
+    if filename.islower():
+        return None
+    return filename.split('.', 1)[0]
+
+
+def _count_rows(data: Dict[str, Dict[str, Any]]) -> int:
+    return sum(len(class_data) for class_data in data.values()
+               if isinstance(class_data, dict))
+
+
+class _DeferredRandomModels:
+    """
+    Records the calls to :func:`random_model` and :func:`random_models` made
+    while rendering a single template, returning unique placeholder strings in
+    their place. The placeholders get resolved after all of the fixture files
+    have been parsed, once every model identifier key is known. They get
+    resolved with the template's own ``random.Random``.
+    """
+    CONTEXT_KEY = '_py_yaml_fixtures_deferred'
+    PLACEHOLDER = '__py_yaml_fixtures_random_model_%d__'
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.calls = {}
+        self.random = rng or random.Random()
+
+    def defer(self, fn: Callable, *args, **kwargs) -> str:
+        placeholder = self.PLACEHOLDER % len(self.calls)
+        self.calls[placeholder] = (fn, args, kwargs)
+        return '"%s"' % placeholder
+
+    def resolve(self,
+                data: Any,
+                model_identifiers: Dict[str, List[str]],
+                yaml_loader: type = DEFAULT_YAML_LOADER):
         """
-        A "stripped" jinja environment.
+        Replace the placeholders in the (parsed) ``data`` in place.
         """
-        ctx = self.env.globals
-        try:
-            ctx['random_model'] = lambda *a, **kw: None
-            ctx['random_models'] = lambda *a, **kw: None
-            yield self.env
-        finally:
-            if hasattr(jinja2, 'pass_context'):
-                ctx['random_model'] = jinja2.pass_context(random_model)
-                ctx['random_models'] = jinja2.pass_context(random_models)
-            else:
-                ctx['random_model'] = jinja2.contextfunction(random_model)
-                ctx['random_models'] = jinja2.contextfunction(random_models)
+        if not self.calls:
+            return
+
+        # call the helpers in the same order the template did
+        ctx = {'model_identifiers': model_identifiers, 'random': self.random}
+        values = {placeholder: yaml.load(fn(ctx, *args, **kwargs), Loader=yaml_loader)
+                  for placeholder, (fn, args, kwargs) in self.calls.items()}
+
+        def _resolve(obj):
+            if isinstance(obj, dict):
+                for k, v in obj.items():
+                    obj[k] = _resolve(v)
+            elif isinstance(obj, list):
+                obj[:] = [_resolve(v) for v in obj]
+            elif isinstance(obj, str) and obj in values:
+                return values[obj]
+            return obj
+
+        _resolve(data)
+
+
+def _deferred_random_model(ctx, model_class_name):
+    return ctx[_DeferredRandomModels.CONTEXT_KEY].defer(random_model, model_class_name)
+
+
+def _deferred_random_models(ctx, model_class_name, min_count=0, max_count=3):
+    return ctx[_DeferredRandomModels.CONTEXT_KEY].defer(
+        random_models, model_class_name, min_count, max_count)
+
+
+def _random_filter(ctx, seq):
+    """
+    Jinja's ``random`` filter, using the template's own ``random.Random``.
+    """
+    try:
+        return ctx[_DeferredRandomModels.CONTEXT_KEY].random.choice(seq)
+    except IndexError:
+        return ctx.environment.undefined('No random item, sequence was empty.')
@@ -10,11 +10,21 @@ from sqlalchemy.orm.exc import UnmappedClassError
 
 from ..fixtures_loader import FixturesLoader
 from ..factories.sqlalchemy import SQLAlchemyModelFactory
+from ..stats import LoaderStats
+from ..utils import parse_model_names
+from ..watch import watch
 
 
 @click.command()
+@click.option('--profile', is_flag=True, default=False,
+              help='Print a summary of the time spent in each phase.')
+@click.option('--watch', 'watch_', is_flag=True, default=False,
+              help='Keep reloading the fixtures when the files change.')
+@click.option('--models', default=None,
+              help='Comma-separated model class names to load the fixtures of '
+                   '(along with the models they refer to).')
 @with_appcontext
-def import_fixtures():
+def import_fixtures(profile=False, watch_=False, models=None):
     models_module_name = app.config.get('FLASK_MODELS_MODULE')
     try:
         models_module = importlib.import_module(models_module_name)
@@ -32,17 +42,32 @@ def import_fixtures():
     model_classes = dict(inspect.getmembers(models_module, _is_model_class))
     factory = SQLAlchemyModelFactory(app.extensions['sqlalchemy'].db.session,
                                      model_classes)
-    loader = FixturesLoader(factory, fixture_dirs=[fixtures_dir])
+    loader = FixturesLoader(factory, fixture_dirs=[fixtures_dir],
+                            stats=LoaderStats() if profile else None)
 
     click.echo('Loading fixtures from %r for models in %r' % (
         fixtures_dir, models_module_name))
-    loader.create_all(lambda identifier, model, created: print(
-        '{action} {identifier}: {model}'.format(
+    only = parse_model_names(models)
+
+    def print_progress(identifier, model, created):
+        print('{action} {identifier}: {model}'.format(
             action='Creating' if created else 'Updating',
             identifier=identifier.key,
             model=repr(model)
-        )))
+        ))
+
+    if watch_:
+        try:
+            watch(loader, print_progress, echo=click.echo, only=only)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    for identifier, model, created in loader.iter_create(only):
+        print_progress(identifier, model, created)
     click.echo('Done adding fixtures')
+    if profile:
+        click.echo(loader.stats.summary())
 
 
 def _is_model_class(obj):
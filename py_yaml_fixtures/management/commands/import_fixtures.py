@@ -6,6 +6,9 @@ from django.core.management.base import BaseCommand
 from py_yaml_fixtures import FixturesLoader
 from py_yaml_fixtures.factories.django import DjangoModelFactory
 from py_yaml_fixtures.fixtures_loader import MULTI_CLASS_FILENAMES
+from py_yaml_fixtures.stats import LoaderStats
+from py_yaml_fixtures.utils import parse_model_names
+from py_yaml_fixtures.watch import watch
 
 
 class Command(BaseCommand):
@@ -15,6 +18,15 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('apps', nargs='*',
                             help='App names to load from (defaults to all)')
+        parser.add_argument('--bulk', action='store_true',
+                            help='Use bulk_create/bulk_update for each model class')
+        parser.add_argument('--profile', action='store_true',
+                            help='Print a summary of the time spent in each phase')
+        parser.add_argument('--watch', action='store_true',
+                            help='Keep reloading the fixtures when the files change')
+        parser.add_argument('--models',
+                            help='Comma-separated model class names to load the '
+                                 'fixtures of (along with the models they refer to)')
 
     def handle(self, *args, **options):
         models = []
@@ -40,12 +52,27 @@ class Command(BaseCommand):
             return
 
         print('Loading fixtures from apps: ' + ', '.join(sorted(apps_with_fixtures)))
-        factory = DjangoModelFactory(models)
-        loader = FixturesLoader(factory, fixture_dirs=fixture_dirs)
-        loader.create_all(lambda identifier, model, created: print(
-            '{action} {identifier}: {model}'.format(
+        factory = DjangoModelFactory(models, bulk=options.get('bulk', False))
+        loader = FixturesLoader(factory, fixture_dirs=fixture_dirs,
+                                stats=LoaderStats() if options.get('profile') else None)
+        only = parse_model_names(options.get('models'))
+
+        def print_progress(identifier, model, created):
+            print('{action} {identifier}: {model}'.format(
                 action='Creating' if created else 'Updating',
                 identifier=identifier.key,
                 model=repr(model)
-            )))
+            ))
+
+        if options.get('watch'):
+            try:
+                watch(loader, print_progress, only=only)
+            except KeyboardInterrupt:
+                pass
+            return
+
+        for identifier, model, created in loader.iter_create(only):
+            print_progress(identifier, model, created)
+        if options.get('profile'):
+            print(loader.stats.summary())
         print('Done loading fixtures. Exiting.')
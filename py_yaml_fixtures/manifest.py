@@ -0,0 +1,50 @@
+import hashlib
+
+from typing import *
+
+from .types import Identifier
+from .utils import load_pickle, save_pickle
+
+
+# bump this whenever the format of the manifest changes
+MANIFEST_VERSION = 1
+
+
+class Manifest:
+    """
+    The state of the last successful load, for incremental re-loading: a
+    hash of the fixture data of each identifier, along with the primary key
+    of its row in the database. The manifest is stored as a pickle file.
+
+    :param path: The path of the manifest file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        self.hashes: Dict[Identifier, str] = {}
+        """The content hash of each identifier's (post-processed) fixture data."""
+
+        self.primary_keys: Dict[Identifier, Any] = {}
+        """The primary key of each identifier's row."""
+
+    @staticmethod
+    def hash(data: Dict[str, Any]) -> str:
+        """
+        Hash the fixture data of an identifier.
+        """
+        return hashlib.sha256(repr(data).encode()).hexdigest()
+
+    def load(self):
+        """
+        Load the manifest file. A missing, corrupt or outdated manifest is
+        treated as empty (ie everything gets loaded).
+        """
+        self.hashes, self.primary_keys = (
+            load_pickle(self.path, MANIFEST_VERSION) or ({}, {}))
+
+    def save(self):
+        """
+        Write the manifest file (atomically).
+        """
+        save_pickle(self.path, MANIFEST_VERSION, (self.hashes, self.primary_keys))
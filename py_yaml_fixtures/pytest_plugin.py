@@ -0,0 +1,59 @@
+"""
+Pytest fixtures for seeding the database from a snapshot of the loaded
+fixtures (see :meth:`FixturesLoader.create_snapshot`), instead of loading the
+fixtures again for every test.
+
+To use them, add ``pytest_plugins = ['py_yaml_fixtures.pytest_plugin']`` to
+your root ``conftest.py``, and override the (session scoped)
+``py_yaml_fixtures_loader`` fixture to return the loader to seed the database
+with. Tests that use the ``py_yaml_fixtures`` fixture then get a freshly
+seeded database.
+"""
+import os
+import pytest
+
+from typing import *
+
+from .fixtures_loader import FixturesLoader
+from .snapshot import Snapshot
+from .types import Identifier
+
+
+@pytest.fixture(scope='session')
+def py_yaml_fixtures_loader() -> FixturesLoader:
+    """
+    The loader to seed the database with. Override this fixture (with the
+    session scope) in your ``conftest.py``.
+    """
+    raise NotImplementedError(
+        'Please override the py_yaml_fixtures_loader fixture to return a FixturesLoader')
+
+
+@pytest.fixture(scope='session')
+def py_yaml_fixtures_snapshot(request, tmp_path_factory,
+                              py_yaml_fixtures_loader: FixturesLoader) -> Snapshot:
+    """
+    The snapshot of the loaded fixtures. It gets stored in the pytest cache
+    directory, so that later test runs reuse it for as long as the fixture
+    files don't change. (Run pytest with ``--cache-clear`` after changing the
+    models.)
+    """
+    cache = getattr(request.config, 'cache', None)
+    snapshot_dir = (str(cache.mkdir('py_yaml_fixtures')) if cache
+                    else str(tmp_path_factory.mktemp('py_yaml_fixtures')))
+    snapshot = Snapshot(os.path.join(snapshot_dir, 'snapshot.pickle'))
+    snapshot.load()
+    if snapshot.fingerprint != py_yaml_fixtures_loader.fingerprint():
+        snapshot = py_yaml_fixtures_loader.create_snapshot(snapshot.path)
+    return snapshot
+
+
+@pytest.fixture()
+def py_yaml_fixtures(py_yaml_fixtures_loader: FixturesLoader,
+                     py_yaml_fixtures_snapshot: Snapshot) -> Dict[Identifier, Any]:
+    """
+    Restore the snapshot of the loaded fixtures before the test, replacing
+    all of the rows in its tables. Returns the primary key of the row of every
+    identifier.
+    """
+    return py_yaml_fixtures_loader.restore_snapshot(py_yaml_fixtures_snapshot)
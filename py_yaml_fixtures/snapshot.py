@@ -0,0 +1,53 @@
+from typing import *
+
+from .types import Identifier
+from .utils import load_pickle, save_pickle
+
+
+# bump this whenever the format of the snapshot changes
+SNAPSHOT_VERSION = 1
+
+
+class Snapshot:
+    """
+    The rows of the tables written by a load, along with the primary key of
+    the row of each identifier, for restoring the database to the state right
+    after the load without loading the fixtures again (see
+    :meth:`FixturesLoader.create_snapshot`). The snapshot is stored as a
+    pickle file.
+
+    :param path: The path of the snapshot file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        self.fingerprint: Optional[str] = None
+        """
+        The fingerprint of the fixture files the snapshot was created from
+        (see :meth:`FixturesLoader.fingerprint`).
+        """
+
+        self.tables: Dict[str, Tuple[List[str], List[tuple]]] = {}
+        """
+        The column names and rows of each table, in the order to restore them
+        in (see :meth:`FactoryInterface.dump_tables`).
+        """
+
+        self.primary_keys: Dict[Identifier, Any] = {}
+        """The primary key of each identifier's row."""
+
+    def load(self):
+        """
+        Load the snapshot file. A missing, corrupt or outdated snapshot is
+        treated as empty (ie with a ``fingerprint`` of None).
+        """
+        self.fingerprint, self.tables, self.primary_keys = (
+            load_pickle(self.path, SNAPSHOT_VERSION) or (None, {}, {}))
+
+    def save(self):
+        """
+        Write the snapshot file (atomically).
+        """
+        save_pickle(self.path, SNAPSHOT_VERSION,
+                    (self.fingerprint, self.tables, self.primary_keys))
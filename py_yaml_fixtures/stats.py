@@ -0,0 +1,141 @@
+import time
+
+from contextlib import contextmanager
+from typing import *
+
+
+class Timing:
+    """
+    The totals measured for one phase of the loading pipeline (optionally
+    for a specific fixture file or model class).
+    """
+    __slots__ = ('wall', 'cpu', 'rows', 'statements', 'calls')
+
+    def __init__(self, wall: float = 0.0, cpu: float = 0.0, rows: int = 0,
+                 statements: int = 0, calls: int = 0):
+        self.wall = wall
+        """Wall-clock time, in seconds."""
+
+        self.cpu = cpu
+        """CPU time of the current process, in seconds."""
+
+        self.rows = rows
+        """The number of rows (identifiers) processed."""
+
+        self.statements = statements
+        """The number of SQL statements issued (if the factory can count them)."""
+
+        self.calls = calls
+        """The number of times this phase was measured."""
+
+    def merge(self, other: 'Timing'):
+        for attr in self.__slots__:
+            setattr(self, attr, getattr(self, attr) + getattr(other, attr))
+
+    def __repr__(self):
+        return ('Timing(wall={wall:.4f}, cpu={cpu:.4f}, rows={rows}, '
+                'statements={statements}, calls={calls})'.format(
+                    **{attr: getattr(self, attr) for attr in self.__slots__}))
+
+
+class LoaderStats:
+    """
+    Collects timings, row counts and SQL statement counts for each phase of
+    loading fixtures, per fixture file or model class. Pass an instance to
+    :class:`~py_yaml_fixtures.FixturesLoader` to enable it.
+
+    The phases are:
+
+    - ``render``: rendering the Jinja templates (per file)
+    - ``parse``: parsing the rendered YAML (per file)
+    - ``cache``: loading rendered and parsed files from the cache (per file)
+    - ``load``: resolving ``random_model(s)`` and identifiers (per file)
+    - ``sort``: determining the order to create the model classes in
+    - ``convert``: the factory's ``maybe_convert_values`` (per model class)
+    - ``write``: looking up existing rows, and creating or updating them
+      (per model class)
+    - ``relationships``: setting the relationships that were deferred to break
+      circular dependencies (per model class)
+    - ``commit``: the final commit
+    """
+    PHASES = ('render', 'parse', 'cache', 'load', 'sort',
+              'convert', 'write', 'relationships', 'commit')
+
+    def __init__(self):
+        self.timings: Dict[Tuple[str, Optional[str]], Timing] = {}
+        """A dict keyed by a tuple of (phase, file or model class name or None)."""
+
+        self.statements = 0
+        """The total number of SQL statements counted so far."""
+
+    def count_statement(self):
+        """
+        Count an SQL statement (called by the factory).
+        """
+        self.statements += 1
+
+    @contextmanager
+    def measure(self, phase: str, name: Optional[str] = None) -> Iterator[Timing]:
+        """
+        Measure the time spent (and SQL statements issued) within the block,
+        adding it to the totals for the given phase and name. Yields a
+        :class:`Timing` whose ``rows`` can be incremented by the caller.
+        """
+        timing = Timing(calls=1)
+        wall, cpu, statements = time.perf_counter(), time.process_time(), self.statements
+        try:
+            yield timing
+        finally:
+            timing.wall = time.perf_counter() - wall
+            timing.cpu = time.process_time() - cpu
+            timing.statements = self.statements - statements
+            self.add(phase, name, timing)
+
+    def add(self, phase: str, name: Optional[str], timing: Timing):
+        """
+        Add a timing to the totals for the given phase and name.
+        """
+        if (phase, name) in self.timings:
+            self.timings[phase, name].merge(timing)
+        else:
+            self.timings[phase, name] = timing
+
+    def by_phase(self) -> Dict[str, Timing]:
+        """
+        The totals for each phase, in pipeline order.
+        """
+        rv = {}
+        for (phase, name), timing in self.timings.items():
+            rv.setdefault(phase, Timing()).merge(timing)
+        return {phase: rv[phase]
+                for phase in sorted(rv, key=lambda x: (x not in self.PHASES,
+                                                       self.PHASES.index(x)
+                                                       if x in self.PHASES else x))}
+
+    def summary(self, detailed: bool = True) -> str:
+        """
+        Format the totals as a table, with a row per phase, followed by a
+        row per file or model class within it (if ``detailed``).
+        """
+        header = ('phase', 'name', 'wall (s)', 'cpu (s)', 'rows', 'sql')
+        lines = []
+        for phase, total in self.by_phase().items():
+            lines.append(_format_row(phase, '', total))
+            if not detailed:
+                continue
+            for (timing_phase, name), timing in sorted(
+                    self.timings.items(), key=lambda x: -x[1].wall):
+                if timing_phase == phase and name is not None:
+                    lines.append(_format_row('', name, timing))
+
+        widths = [max(len(row[i]) for row in [header] + lines)
+                  for i in range(len(header))]
+        return '\n'.join(
+            '  '.join(value.ljust(width) if i < 2 else value.rjust(width)
+                      for i, (value, width) in enumerate(zip(row, widths))).rstrip()
+            for row in [header, tuple('-' * width for width in widths)] + lines)
+
+
+def _format_row(phase: str, name: str, timing: Timing) -> Tuple[str, ...]:
+    return (phase, name, '%.3f' % timing.wall, '%.3f' % timing.cpu,
+            str(timing.rows), str(timing.statements))
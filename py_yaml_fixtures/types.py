@@ -1,10 +1,39 @@
+import weakref
+
 from typing import *
 
 
 class Identifier:
-    def __init__(self, class_name: str, key: Union[int, str]):
-        self.class_name = class_name
-        self.key = key
+    """
+    An immutable reference to a model fixture, by its model class name and
+    identifier key. Identifiers are hashable, and interned: there is only ever
+    one live instance per ``(class_name, key)``.
+    """
+    __slots__ = ('class_name', 'key', '_hash', '__weakref__')
+
+    _instances = weakref.WeakValueDictionary()
+
+    def __new__(cls, class_name: str, key: Union[int, str]):
+        try:
+            return cls._instances[(cls, class_name, key)]
+        except KeyError:
+            pass
+
+        self = super().__new__(cls)
+        object.__setattr__(self, 'class_name', class_name)
+        object.__setattr__(self, 'key', key)
+        object.__setattr__(self, '_hash', hash((class_name, key)))
+        cls._instances[(cls, class_name, key)] = self
+        return self
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Identifier instances are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Identifier instances are immutable')
+
+    def __reduce__(self):
+        return type(self), (self.class_name, self.key)
 
     def __iter__(self):
         return iter([self.class_name, self.key])
@@ -12,7 +41,12 @@ class Identifier:
     def __repr__(self):
         return '{cls}({key})'.format(cls=self.class_name, key=self.key)
 
+    def __hash__(self):
+        return self._hash
+
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Identifier):
             return False
         return self.class_name == other.class_name and self.key == other.key
@@ -1,9 +1,12 @@
+import os
+import pickle
 import random
 import re
+import tempfile
 
-from collections import defaultdict
 from datetime import date, datetime, time, timezone
 from dateutil.parser import parse as parse_datetime
+from functools import lru_cache
 from typing import *
 
 from .types import Identifier
@@ -11,8 +14,137 @@ from .types import Identifier
 
 IDENTIFIER_RE = re.compile(r'(?P<class_name>\w+)\((?P<identifiers>[\w,\s]+)\)')
 
+# the maximum number of distinct strings to memoize the parsed datetimes of
+DATETIME_CACHE_SIZE = 4096
 
-def datetime_factory(value):
+# the maximum number of distinct strings to memoize the parsed identifiers of
+IDENTIFIER_CACHE_SIZE = 4096
+
+
+class CircularDependencyError(Exception):
+    """
+    Raised by :func:`topological_sort` when the graph has a cycle.
+    """
+    def __init__(self, cycle: List[Hashable], msg: Optional[str] = None):
+        self.cycle = cycle
+        """The nodes making up the cycle (the first and last are the same)."""
+        super().__init__(msg or 'Circular dependency detected: ' + ' -> '.join(
+            str(node) for node in cycle))
+
+
+def topological_sort(graph: Dict[Hashable, Iterable[Hashable]]) -> List[Hashable]:
+    """
+    Sort the nodes of a dependency graph so that every node comes after all of
+    its dependencies. The order is deterministic: it only depends upon the
+    iteration order of the graph.
+
+    :param graph: A dictionary keyed by node, where the values are the nodes
+                  it depends on (which don't need to be keys themselves)
+    :raises CircularDependencyError: if the graph has a cycle
+    """
+    rv = []
+    visiting, done = set(), set()
+    for root in graph:
+        if root in done:
+            continue
+
+        # an iterative depth-first search, so that large graphs can't hit the
+        # recursion limit
+        visiting.add(root)
+        stack = [(root, iter(graph.get(root, ())))]
+        while stack:
+            node, deps = stack[-1]
+            for dep in deps:
+                if dep in visiting:
+                    path = [n for n, _ in stack]
+                    raise CircularDependencyError(path[path.index(dep):] + [dep])
+                elif dep not in done:
+                    visiting.add(dep)
+                    stack.append((dep, iter(graph.get(dep, ()))))
+                    break
+            else:
+                stack.pop()
+                visiting.remove(node)
+                done.add(node)
+                rv.append(node)
+    return rv
+
+
+def topological_levels(graph: Dict[Hashable, Iterable[Hashable]]) -> List[List[Hashable]]:
+    """
+    Like :func:`topological_sort`, except that the nodes get grouped into
+    levels: all of the dependencies of a node are in earlier levels, so the
+    nodes within a level don't depend on each other.
+
+    :param graph: A dictionary keyed by node, where the values are the nodes
+                  it depends on (which don't need to be keys themselves)
+    :raises CircularDependencyError: if the graph has a cycle
+    """
+    levels = {}
+    for node in topological_sort(graph):
+        levels[node] = max((levels[dep] + 1 for dep in graph.get(node, ())), default=0)
+
+    rv = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+    for node, level in levels.items():
+        rv[level].append(node)
+    return rv
+
+
+def load_pickle(path: str, version: int) -> Optional[Any]:
+    """
+    Load a file written by :func:`save_pickle`. A missing or corrupt file, or
+    one written with a different ``version``, is treated as missing.
+
+    :return: The stored value, or None if there is none
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (EOFError, ValueError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+    if isinstance(data, tuple) and len(data) == 2 and data[0] == version:
+        return data[1]
+    return None
+
+
+def save_pickle(path: str, version: int, value: Any):
+    """
+    Pickle the value along with the version of its format, writing to a
+    temporary file first so that readers (and concurrent writers) never see
+    a partially written file.
+    """
+    dirname = os.path.dirname(os.path.abspath(path))
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((version, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def parse_model_names(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated list of model class names (eg the ``--models``
+    option of the CLI commands), ignoring whitespace and empty names.
+
+    :return: The list of names, or None if ``value`` is empty
+    """
+    names = [name.strip() for name in (value or '').split(',') if name.strip()]
+    return names or None
+
+
+def datetime_factory(value, format: Optional[str] = None):
+    """
+    Convert a fixture value to a datetime. Strings are parsed with
+    ``format`` (using :meth:`datetime.strptime`) if it's given, otherwise as
+    ISO 8601 if possible, falling back to :func:`dateutil.parser.parse`.
+    """
     if value in {None, '', 'None'}:
         return None
     elif isinstance(value, datetime):
@@ -21,21 +153,38 @@ def datetime_factory(value):
         return datetime.combine(value, time(tzinfo=timezone.utc))
     elif value in {'today', 'now', 'utcnow'}:
         return datetime.now(timezone.utc)
-    return parse_datetime(value)
+    return _parse_datetime(value, format)
 
 
-def date_factory(value):
+def date_factory(value, format: Optional[str] = None):
+    """
+    Convert a fixture value to a date (see :func:`datetime_factory`).
+    """
     if isinstance(value, datetime):
         return value.date()
     elif isinstance(value, date):
         return value
 
-    dt = datetime_factory(value)
+    dt = datetime_factory(value, format)
     if isinstance(dt, datetime):
         return dt.date()
     return dt
 
 
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _parse_datetime(value: str, format: Optional[str] = None) -> datetime:
+    # fixtures tend to repeat the same timestamps, hence the memoization
+    if format:
+        return datetime.strptime(value, format)
+
+    # much faster than dateutil for ISO 8601 strings (which, with the exception
+    # of "Z" on Python < 3.11, it parses the same as dateutil does)
+    try:
+        return datetime.fromisoformat(value)
+    except (AttributeError, TypeError, ValueError):  # AttributeError: Python < 3.7
+        return parse_datetime(value)
+
+
 def random_model(ctx, model_class_name):
     """
     Get a random model identifier by class name. For example::
@@ -56,13 +205,15 @@ def random_model(ctx, model_class_name):
         a blog_post:
             category: "Category(category7)"
 
-    :param ctx: The context variables of the current template (passed automatically)
+    :param ctx: The context variables of the current template (passed
+                automatically), optionally including a ``random.Random`` to use
     :param model_class_name: The class name of the model to get.
     """
+    rng = ctx.get('random') or random
     model_identifiers = ctx['model_identifiers'][model_class_name]
     if not model_identifiers:
         return 'None'
-    idx = random.randrange(0, len(model_identifiers))
+    idx = rng.randrange(0, len(model_identifiers))
     return '"%s(%s)"' % (model_class_name, model_identifiers[idx])
 
 
@@ -86,20 +237,22 @@ def random_models(ctx, model_class_name, min_count=0, max_count=3):
         a blog_post:
             tags: ["Tag(tag2, tag5)"]
 
-    :param ctx: The context variables of the current template (passed automatically)
+    :param ctx: The context variables of the current template (passed
+                automatically), optionally including a ``random.Random`` to use
     :param model_class_name: The class name of the models to get.
     :param min_count: The minimum number of models to return.
     :param max_count: The maximum number of models to return.
     """
+    rng = ctx.get('random') or random
     model_identifiers = ctx['model_identifiers'][model_class_name]
-    num_models = random.randint(min_count, min(max_count, len(model_identifiers)))
+    num_models = rng.randint(min_count, min(max_count, len(model_identifiers)))
     if num_models == 0:
         return '[]'
 
-    added = set()
+    added = {}  # an ordered set, so that seeded output doesn't depend on the hash seed
     while len(added) < num_models:
-        idx = random.randrange(0, len(model_identifiers))
-        added.add(model_identifiers[idx])
+        idx = rng.randrange(0, len(model_identifiers))
+        added[model_identifiers[idx]] = None
     return '["%s(%s)"]' % (model_class_name, ','.join(added))
 
 
@@ -108,52 +261,76 @@ def normalize_identifiers(identifiers: Union[str, List[str]]) -> List[Identifier
         return identifiers
 
     if isinstance(identifiers, str):
-        identifiers = _convert_str(identifiers)
-    if isinstance(identifiers, (list, tuple)):
-        identifiers = _group_by_class_name(identifiers)
-
-    rv = {}
-    for class_name, values in identifiers.items():
-        if not class_name:
-            raise Exception('Identifier must have a class name.')
-        for key in _flatten_csv_list(values):
-            if not key:
-                continue
-            rv[key] = Identifier(class_name, key)
-    return list(rv.values())
-
-
-def _group_by_class_name(identifiers: List[str]) -> DefaultDict[str, List[str]]:
-    rv = defaultdict(list)
-    for v in identifiers:
-        if isinstance(v, Identifier):
-            rv[v.class_name].append(v.key)
-        elif isinstance(v, str):
-            for identifier in _convert_str(v):
-                rv[identifier.class_name].append(identifier.key)
+        return list(_parse_identifiers(identifiers))
+    elif isinstance(identifiers, (list, tuple)):
+        pairs = []
+        for v in identifiers:
+            if isinstance(v, Identifier):
+                pairs.append((v.class_name, v.key))
+            elif isinstance(v, str):
+                pairs.extend(_find_identifiers(v))
+            else:
+                raise Exception(
+                    'Unexpected type {t} (for {v!r})'.format(t=type(v), v=v))
+    else:
+        pairs = [(class_name, key)
+                 for class_name, keys in identifiers.items() for key in keys]
+    return list(_group_identifiers(pairs))
+
+
+def normalize_identifiers_bulk(values: Iterable[Union[str, List[str]]],
+                               ) -> List[List[Identifier]]:
+    """
+    Like :func:`normalize_identifiers`, for all of the values of a column at
+    once. Each distinct string only gets parsed once.
+    """
+    rv = []
+    parsed = {}
+    for value in values:
+        if value and isinstance(value, str):
+            if value not in parsed:
+                parsed[value] = _parse_identifiers(value)
+            rv.append(list(parsed[value]))
         else:
-            raise Exception(
-                'Unexpected type {t} (for {v!r})'.format(t=type(v), v=v))
+            rv.append(normalize_identifiers(value))
     return rv
 
 
-def _flatten_csv_list(identifier_keys: List[str]) -> List[str]:
-    return [key.strip()
-            for keys in identifier_keys
-            for key in keys.strip(',').split(',')]
+@lru_cache(maxsize=IDENTIFIER_CACHE_SIZE)
+def _parse_identifiers(value: str) -> Tuple[Identifier, ...]:
+    """
+    Parse a string of identifiers, eg ``"Model(a, b), Other(c)"``. The results
+    are memoized because the same strings tend to repeat many times throughout
+    fixture files.
+    """
+    return _group_identifiers(_find_identifiers(value))
 
 
-def _convert_str(value: str) -> List[Identifier]:
+def _find_identifiers(value: str) -> List[Tuple[str, str]]:
+    """
+    Find the pairs of class names and comma-separated identifier keys in a
+    string, in a single pass.
+    """
     value = ''.join(value.splitlines())
-    rv = []
-    prev = None
-    while True:
-        match = IDENTIFIER_RE.search(value, prev.end() if prev else 0)
-        if not match and not rv:
-            raise Exception('Identifier must have a class name. (got %r)' % value)
-        elif not match:
-            return rv
-
-        rv.append(Identifier(match.group('class_name'),
-                             match.group('identifiers')))
-        prev = match
+    matches = IDENTIFIER_RE.findall(value)
+    if not matches:
+        raise Exception('Identifier must have a class name. (got %r)' % value)
+    return matches
+
+
+def _group_identifiers(pairs: Iterable[Tuple[str, str]]) -> Tuple[Identifier, ...]:
+    """
+    Convert pairs of class names and comma-separated identifier keys into
+    unique Identifiers, grouped by class name (in order of first appearance).
+    """
+    grouped = {}
+    for class_name, keys in pairs:
+        if not class_name:
+            raise Exception('Identifier must have a class name.')
+        class_keys = grouped.setdefault(class_name, {})  # an ordered set
+        for key in keys.split(','):
+            key = key.strip()
+            if key:
+                class_keys[key] = None
+    return tuple(Identifier(class_name, key)
+                 for class_name, keys in grouped.items() for key in keys)
@@ -0,0 +1,191 @@
+import os
+import tempfile
+import threading
+import time
+
+from typing import *
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+from .cache import RenderCache
+from .fixtures_loader import FixturesLoader
+from .manifest import Manifest
+
+
+class FixturesWatcher:
+    """
+    Watches a loader's fixture files for changes, using
+    `watchdog <https://pypi.org/project/watchdog/>`_ (inotify, FSEvents, etc)
+    if it's installed, or by polling the modification times otherwise. Only
+    the files the loader would load count (see
+    :meth:`FixturesLoader.find_fixture_files`).
+
+    :param loader: The fixtures loader whose files to watch
+    :param poll_interval: How often to check for changes when polling, in seconds
+    :param debounce: How long to wait for more changes after one was detected,
+                     in seconds (editors often write files in several steps)
+    :param use_watchdog: Whether to use watchdog (defaults to whether it's installed)
+    """
+
+    def __init__(self,
+                 loader: FixturesLoader,
+                 poll_interval: float = 1.0,
+                 debounce: float = 0.25,
+                 use_watchdog: Optional[bool] = None):
+        self.loader = loader
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_watchdog = Observer is not None if use_watchdog is None else use_watchdog
+
+    def changes(self) -> Iterator[Set[str]]:
+        """
+        Block until fixture files changed, then yield the set of their paths
+        (including deleted ones), forever.
+        """
+        if self.use_watchdog:
+            yield from self._watchdog_changes()
+        else:
+            yield from self._polling_changes()
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """
+        The modification time and size of every fixture file, keyed by path.
+        """
+        try:
+            paths = self.loader.find_fixture_files(cached=False)
+        except FileNotFoundError:  # eg a fixtures directory got (re)moved
+            paths = []
+
+        rv = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            rv[path] = (stat.st_mtime_ns, stat.st_size)
+        return rv
+
+    def _polling_changes(self) -> Iterator[Set[str]]:
+        snapshot = self.snapshot()
+        while True:
+            time.sleep(self.poll_interval)
+            current = self.snapshot()
+            if current == snapshot:
+                continue
+
+            # wait for the files to stop changing
+            while True:
+                time.sleep(self.debounce)
+                latest = self.snapshot()
+                if latest == current:
+                    break
+                current = latest
+
+            yield _changed_paths(snapshot, current)
+            snapshot = current
+
+    def _watchdog_changes(self) -> Iterator[Set[str]]:
+        handler = _EventHandler()
+        observer = Observer()
+        for fixtures_dir in self.loader.fixture_dirs:
+            observer.schedule(handler, fixtures_dir, recursive=self.loader.recursive)
+        snapshot = self.snapshot()
+        observer.start()
+        try:
+            while True:
+                handler.changed.wait()
+                # wait for the files to stop changing
+                while handler.changed.wait(self.debounce):
+                    handler.changed.clear()
+
+                # the events are only a hint, the snapshots decide what changed
+                current = self.snapshot()
+                paths = _changed_paths(snapshot, current)
+                snapshot = current
+                if paths:
+                    yield paths
+        finally:
+            observer.stop()
+            observer.join()
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self):
+        super().__init__()
+        self.changed = threading.Event()
+
+    def on_any_event(self, event):
+        self.changed.set()
+
+
+def _changed_paths(snapshot: Dict[str, Tuple[int, int]],
+                   current: Dict[str, Tuple[int, int]],
+                   ) -> Set[str]:
+    return {path for path in set(snapshot) | set(current)
+            if snapshot.get(path) != current.get(path)}
+
+
+def watch(loader: FixturesLoader,
+          callback: Optional[Callable[[Any, object, bool], None]] = None,
+          echo: Callable[[str], None] = print,
+          max_reloads: Optional[int] = None,
+          only: Optional[Iterable[str]] = None,
+          **watcher_kwargs):
+    """
+    Load the fixtures, then keep reloading them whenever the fixture files
+    change, until interrupted. Only the changed files get rendered again, and
+    only the identifiers that changed (or that refer to changed ones, directly
+    or indirectly) get written, using the loader's ``cache_dir`` and
+    ``manifest_path`` (or temporary ones, if they're not set). Errors are
+    reported with ``echo``, instead of stopping the watcher.
+
+    :param loader: The fixtures loader (which is reused, so that its jinja
+                   environment and the factory stay warm)
+    :param callback: An optional function called for each model created or
+                     updated (see :meth:`FixturesLoader.create_all`)
+    :param echo: The function to report progress with
+    :param max_reloads: Stop after this many reloads (mostly for testing)
+    :param only: An optional list of model class names to load the models of
+                 (see :meth:`FixturesLoader.create_all`)
+    :param watcher_kwargs: Passed on to :class:`FixturesWatcher`
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if not loader.cache:
+            loader.cache = RenderCache(os.path.join(tmp_dir, 'cache'))
+        if not loader.manifest:
+            loader.manifest = Manifest(os.path.join(tmp_dir, 'manifest.pickle'))
+
+        watcher = FixturesWatcher(loader, **watcher_kwargs)
+        _load(loader, callback, echo, only)
+        if max_reloads == 0:
+            return
+
+        echo('Watching for changes to fixtures in: ' + ', '.join(loader.fixture_dirs))
+        for i, paths in enumerate(watcher.changes()):
+            echo('Detected changes to: ' + ', '.join(sorted(paths)))
+            loader.reset()
+            _load(loader, callback, echo, only)
+            if max_reloads and i + 1 >= max_reloads:
+                return
+
+
+def _load(loader: FixturesLoader,
+          callback: Optional[Callable[[Any, object, bool], None]],
+          echo: Callable[[str], None],
+          only: Optional[Iterable[str]] = None):
+    count = 0
+    try:
+        for identifier, model, created in loader.iter_create(only):
+            count += 1
+            if callback:
+                callback(identifier, model, created)
+    except Exception as e:
+        loader.factory.rollback()
+        echo('Error loading fixtures: {e!r}'.format(e=e))
+    else:
+        echo('Loaded fixtures ({count} created or updated)'.format(count=count))
@@ -34,7 +34,6 @@ setup(
     install_requires=[
         'faker>=1.0.7',
         'jinja2>=2.10.1',
-        'networkx>=2.3',
         'python-dateutil>=2.8.0',
         'PyYAML>=5.1',
     ],
@@ -71,6 +70,12 @@ setup(
         'sqlalchemy': [
             'sqlalchemy>=1.0',
         ],
+        'sqlalchemy-asyncio': [
+            'sqlalchemy[asyncio]>=1.4',
+        ],
+        'watch': [
+            'watchdog',
+        ],
     },
     python_requires='>=3.5',
     include_package_data=True,
@@ -1,10 +1,17 @@
+import asyncio
+import os
 import pytest
 
 from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from io import StringIO
 
 from django.core.management import call_command
 
-from django_test_app.models import User, Article, Category, Tag
+from django_test_app.models import User, Article, Category, Person, Tag
+from py_yaml_fixtures import FixturesLoader
+from py_yaml_fixtures.factories.django import DjangoModelFactory
+from py_yaml_fixtures.types import Identifier
 
 
 @pytest.mark.django_db
@@ -13,6 +20,122 @@ def test_django_integration(django_db_blocker):
         with redirect_stdout(None):
             call_command("import_fixtures", "django_test_app")
 
+    _assert_fixtures_loaded()
+
+
+@pytest.mark.django_db
+def test_django_integration_bulk(django_db_blocker):
+    with django_db_blocker.unblock():
+        with redirect_stdout(None):
+            call_command("import_fixtures", "django_test_app", "--bulk")
+            _assert_fixtures_loaded()
+
+            # loading again should update the existing rows instead of duplicating them
+            call_command("import_fixtures", "django_test_app", "--bulk")
+            _assert_fixtures_loaded()
+
+
+@pytest.mark.django_db
+def test_bulk_reimport_converts_lookup_values(tmp_path):
+    with open(str(tmp_path / "User.yml"), "w") as f:
+        f.write("numbers:\n  username: 123\n  email: numbers@example.com\n")
+
+    for _ in range(2):  # the second time updates the existing row
+        factory = DjangoModelFactory([User], bulk=True)
+        FixturesLoader(factory, fixture_dirs=[str(tmp_path)]).create_all()
+
+    assert list(User.objects.values_list("username", flat=True)) == ["123"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("bulk", [False, True])
+def test_symmetrical_many_to_many(tmp_path, bulk):
+    with open(str(tmp_path / "Person.yml"), "w") as f:
+        f.write("alice:\n  name: Alice\n  friends: Person(bob, carol)\n"
+                "bob:\n  name: Bob\n"
+                "carol:\n  name: Carol\n  friends: [Person(alice)]\n")
+
+    factory = DjangoModelFactory([Person], bulk=bulk)
+    FixturesLoader(factory, fixture_dirs=[str(tmp_path)]).create_all()
+
+    def friends(name):
+        return set(Person.objects.get(name=name).friends.values_list("name", flat=True))
+
+    assert friends("Alice") == {"Bob", "Carol"}
+    assert friends("Bob") == {"Alice"}
+    assert friends("Carol") == {"Alice"}
+
+
+@pytest.mark.django_db
+def test_django_integration_models(django_db_blocker):
+    with django_db_blocker.unblock():
+        with redirect_stdout(None):
+            call_command("import_fixtures", "django_test_app", "--models", " Category, ")
+
+    assert set(Category.objects.values_list("name", flat=True)) == {"Food", "Vacation"}
+    assert not Article.objects.exists()
+    assert not User.objects.exists()
+
+
+@pytest.mark.django_db
+def test_django_integration_profile(django_db_blocker):
+    stdout = StringIO()
+    with django_db_blocker.unblock():
+        with redirect_stdout(stdout):
+            call_command("import_fixtures", "django_test_app", "--profile")
+
+    _assert_fixtures_loaded()
+    summary = stdout.getvalue()
+    assert "wall (s)" in summary
+    for name in ["Article", "Category", "Tag", "User"]:
+        assert name in summary
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_all_async():
+    import django_test_app
+    factory = DjangoModelFactory([User, Article, Category, Tag])
+    loader = FixturesLoader(factory, fixture_dirs=[
+        os.path.join(os.path.dirname(django_test_app.__file__), "fixtures")])
+    rv = asyncio.run(loader.create_all_async())
+
+    assert rv["grace"].username == "grace"
+    _assert_fixtures_loaded()
+
+
+@pytest.mark.django_db
+def test_snapshot(tmp_path):
+    import django_test_app
+    factory = DjangoModelFactory([User, Article, Category, Tag])
+    loader = FixturesLoader(factory, fixture_dirs=[
+        os.path.join(os.path.dirname(django_test_app.__file__), "fixtures")])
+    snapshot = loader.create_snapshot(str(tmp_path / "snapshot.pickle"))
+    _assert_fixtures_loaded()
+
+    Article.objects.get(title="Pasta in Canada").tags.clear()
+    Tag.objects.create(name="Rust")
+    User.objects.filter(username="judy").delete()
+
+    primary_keys = loader.restore_snapshot(snapshot.path)
+    _assert_fixtures_loaded()
+    assert primary_keys[Identifier("User", "grace")] == \
+        User.objects.get(username="grace").pk
+
+    # the sequences get reset, so new rows don't clash with the restored ones
+    Tag.objects.create(name="Rust")
+
+
+def test_maybe_convert_values():
+    factory = DjangoModelFactory([User, Article, Category, Tag])
+    data = {"username": "grace", "date_joined": "2020-01-02T03:04:05Z"}
+    for _ in range(2):  # the second time uses the cached conversion plan
+        assert factory.maybe_convert_values(Identifier("User", "grace"), data) == {
+            "username": "grace",
+            "date_joined": datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        }
+
+
+def _assert_fixtures_loaded():
     users = set(User.objects.values_list("username", flat=True))
     assert users == {"grace", "judy"}
 
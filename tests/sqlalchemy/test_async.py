@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+
+from py_yaml_fixtures import FixturesLoader
+from py_yaml_fixtures.stats import LoaderStats
+from py_yaml_fixtures.types import Identifier
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from .test_bulk import Author, BaseModel, BULK_FIXTURES_DIR, MODELS, _assert_loaded
+from .test_cycles import (Category, CYCLES_FIXTURES_DIR, MODELS as CYCLES_MODELS, Post,
+                          User)
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('greenlet')
+
+from py_yaml_fixtures.factories.sqlalchemy_async import AsyncSQLAlchemyModelFactory
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+def _create_all(db_path, models, fixtures_dir, **kwargs):
+    async def create_all():
+        engine = create_async_engine('sqlite+aiosqlite:///' + db_path)
+        try:
+            factory = AsyncSQLAlchemyModelFactory(engine, models, **kwargs)
+            loader = FixturesLoader(factory, fixture_dirs=[fixtures_dir],
+                                    stats=LoaderStats())
+            return factory, loader, await loader.create_all_async()
+        finally:
+            await engine.dispose()
+    return asyncio.run(create_all())
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_create_all_async(tmp_path, bulk):
+    db_path = str(tmp_path / 'db.sqlite')
+    engine = create_engine('sqlite:///' + db_path)
+    BaseModel.metadata.create_all(bind=engine)
+
+    for _ in range(2):  # the second time updates the existing rows
+        factory, loader, rv = _create_all(db_path, MODELS, BULK_FIXTURES_DIR, bulk=bulk)
+        assert len(rv) == len(factory.primary_keys) == 7
+        assert not any(factory.model_instances.values())
+        alice_id = rv['alice']['id'] if bulk else rv['alice'].id
+        assert factory.primary_keys[Identifier('Author', 'alice')] == alice_id
+
+        # Author and Comment (which both depend on Article) get written concurrently
+        assert loader.stats.by_phase()['write'].rows == 7
+        assert loader.stats.by_phase()['write'].statements > 0
+
+        session = sessionmaker(bind=engine)()
+        _assert_loaded(session)
+        assert session.query(Author).count() == 1
+        session.close()
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_create_all_async_cycles(tmp_path, bulk):
+    db_path = str(tmp_path / 'db.sqlite')
+    engine = create_engine('sqlite:///' + db_path)
+    CYCLES_MODELS[0].metadata.create_all(bind=engine)
+
+    _create_all(db_path, CYCLES_MODELS, CYCLES_FIXTURES_DIR, bulk=bulk)
+    session = sessionmaker(bind=engine)()
+    python = session.query(Category).filter_by(name='Python').one()
+    assert python.parent.parent.name == 'Root'
+    alice = session.query(User).one()
+    assert alice.favorite_post == session.query(Post).one()
@@ -0,0 +1,282 @@
+import os
+import pytest
+import sqlalchemy as sa
+
+from py_yaml_fixtures import FixturesLoader
+from py_yaml_fixtures.factories.sqlalchemy import SQLAlchemyModelFactory
+from py_yaml_fixtures.stats import LoaderStats
+from py_yaml_fixtures.types import Identifier
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship, sessionmaker
+
+BULK_FIXTURES_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'bulk')
+
+
+BaseModel = declarative_base()
+
+article_tags = sa.Table(
+    'article_tags', BaseModel.metadata,
+    sa.Column('article_id', sa.Integer, sa.ForeignKey('article.id'), primary_key=True),
+    sa.Column('tag_id', sa.Integer, sa.ForeignKey('tag.id'), primary_key=True),
+)
+
+
+class Author(BaseModel):
+    __tablename__ = 'author'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String, unique=True)
+    articles = relationship('Article', back_populates='author')
+
+
+class Tag(BaseModel):
+    __tablename__ = 'tag'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String, unique=True)
+
+
+class Article(BaseModel):
+    __tablename__ = 'article'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    title = sa.Column(sa.String, unique=True)
+    author_id = sa.Column(sa.Integer, sa.ForeignKey('author.id'))
+    author = relationship('Author', back_populates='articles')
+    tags = relationship('Tag', secondary=article_tags)
+
+
+class Comment(BaseModel):
+    __tablename__ = 'comment'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    body = sa.Column(sa.String)
+    article_id = sa.Column(sa.Integer, sa.ForeignKey('article.id'))
+    article = relationship('Article')
+
+
+MODELS = [Author, Tag, Article, Comment]
+
+
+def _load(session, **factory_kwargs):
+    factory = SQLAlchemyModelFactory(session, MODELS, **factory_kwargs)
+    loader = FixturesLoader(factory, fixture_dirs=[BULK_FIXTURES_DIR])
+    return loader.create_all()
+
+
+def _assert_loaded(session):
+    assert session.query(Tag).count() == 2
+    assert session.query(Comment).count() == 2
+
+    alice = session.query(Author).filter_by(name='Alice').one()
+    hello = session.query(Article).filter_by(title='Hello').one()
+    bye = session.query(Article).filter_by(title='Bye').one()
+    assert set(alice.articles) == {hello, bye}
+    assert {tag.name for tag in hello.tags} == {'Python', 'SQL'}
+    assert {tag.name for tag in bye.tags} == {'SQL'}
+    assert {comment.body for comment in session.query(Comment).filter_by(
+        article=hello)} == {'First!', 'Second!'}
+
+
+def test_bulk_create_and_update():
+    engine = create_engine('sqlite:///:memory:')
+    BaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    rv = _load(session, bulk=True)
+    assert rv['alice']['id'] is not None
+    _assert_loaded(session)
+
+    # loading again should update the existing rows instead of duplicating them
+    _load(session, bulk=True)
+    _assert_loaded(session)
+
+
+def test_bulk_matches_unit_of_work():
+    bulk_engine = create_engine('sqlite:///:memory:')
+    orm_engine = create_engine('sqlite:///:memory:')
+    for engine in [bulk_engine, orm_engine]:
+        BaseModel.metadata.create_all(bind=engine)
+
+    _load(sessionmaker(bind=bulk_engine)(), bulk=True)
+    _load(sessionmaker(bind=orm_engine)())
+
+    for table in BaseModel.metadata.sorted_tables:
+        with bulk_engine.connect() as bulk, orm_engine.connect() as orm:
+            assert (sorted(bulk.execute(table.select()).fetchall())
+                    == sorted(orm.execute(table.select()).fetchall()))
+
+
+ShelfBaseModel = declarative_base()
+
+
+class Shelf(ShelfBaseModel):
+    __tablename__ = 'shelf'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String, unique=True)
+    books = relationship('Book', cascade='all, delete-orphan')
+
+
+class Book(ShelfBaseModel):
+    __tablename__ = 'book'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    title = sa.Column(sa.String, unique=True)
+    shelf_id = sa.Column(sa.Integer, sa.ForeignKey('shelf.id'))
+
+
+with open(os.path.join(BULK_FIXTURES_DIR, 'fixtures.yml')) as f:
+    _BULK_FIXTURES = f.read()
+_SHELF_FIXTURES = ('Shelf:\n  fiction:\n    name: Fiction\n    books: Book(dune, emma)\n'
+                   'Book:\n  dune:\n    title: Dune\n  emma:\n    title: Emma\n')
+
+
+@pytest.mark.parametrize('base_model, models, fixtures, shrunk', [
+    # the removed article's foreign key gets cleared
+    (BaseModel, MODELS, _BULK_FIXTURES,
+     _BULK_FIXTURES.replace('articles: Article(hello, bye)', 'articles: [Article(hello)]')),
+    # the removed book gets deleted, like the relationship cascades
+    (ShelfBaseModel, [Shelf, Book], _SHELF_FIXTURES,
+     _SHELF_FIXTURES.replace('Book(dune, emma)', '[Book(dune)]').replace(
+         '  emma:\n    title: Emma\n', '')),
+], ids=['clear-foreign-key', 'delete-orphan'])
+def test_bulk_matches_unit_of_work_for_shrinking_collections(
+        tmp_path, base_model, models, fixtures, shrunk):
+    fixtures_path = str(tmp_path / 'fixtures.yml')
+    engines = {}
+    for bulk in [False, True]:
+        engines[bulk] = create_engine('sqlite:///:memory:')
+        base_model.metadata.create_all(bind=engines[bulk])
+        session = sessionmaker(bind=engines[bulk])()
+        for source in [fixtures, shrunk]:
+            with open(fixtures_path, 'w') as f:
+                f.write(source)
+            factory = SQLAlchemyModelFactory(session, models, bulk=bulk)
+            FixturesLoader(factory, fixture_dirs=[str(tmp_path)]).create_all()
+
+    for table in base_model.metadata.sorted_tables:
+        with engines[True].connect() as bulk, engines[False].connect() as orm:
+            assert (sorted(bulk.execute(table.select()).fetchall())
+                    == sorted(orm.execute(table.select()).fetchall()))
+
+    with engines[True].connect() as conn:
+        if base_model is BaseModel:
+            assert conn.execute(sa.select(Article.author_id).filter_by(
+                title='Bye')).scalar() is None
+        else:
+            assert conn.execute(sa.select(Book.title)).scalars().all() == ['Dune']
+
+
+def test_existing_rows_are_looked_up_in_batches():
+    engine = create_engine('sqlite:///:memory:')
+    BaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    _load(session)
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    for bulk in [False, True]:
+        statements.clear()
+        _load(session, bulk=bulk)
+
+        # one lookup query per model class, instead of one per row
+        selects = [x for x in statements if x.startswith('SELECT')
+                   and ' IN ' in x and 'article_tags' not in x]
+        assert len(selects) == len(MODELS)
+
+        # including for the comments, which get looked up by their foreign key
+        assert not [x for x in statements if x.startswith('SELECT')
+                    and 'FROM comment' in x and ' IN ' not in x]
+        _assert_loaded(session)
+
+
+ProductBaseModel = declarative_base()
+
+
+class Product(ProductBaseModel):
+    __tablename__ = 'product'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    sku = sa.Column(sa.String, unique=True)
+    stock = sa.Column(sa.Integer, unique=True)
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_reimport_converts_lookup_values(tmp_path, bulk):
+    with open(str(tmp_path / 'Product.yml'), 'w') as f:
+        f.write("widget:\n  sku: 123\n  stock: '5'\n"
+                "gadget:\n  sku: 0123a\n  stock: '007'\n")
+
+    engine = create_engine('sqlite:///:memory:')
+    ProductBaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for _ in range(2):  # the second time updates the existing rows
+        factory = SQLAlchemyModelFactory(session, [Product], bulk=bulk)
+        FixturesLoader(factory, fixture_dirs=[str(tmp_path)]).create_all()
+
+    assert sorted(session.query(Product.sku, Product.stock)) == [('0123a', 7), ('123', 5)]
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_iter_create(bulk):
+    engine = create_engine('sqlite:///:memory:')
+    BaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    for _ in range(2):  # the second time updates the existing rows
+        factory = SQLAlchemyModelFactory(session, MODELS, bulk=bulk)
+        loader = FixturesLoader(factory, fixture_dirs=[BULK_FIXTURES_DIR])
+        results = list(loader.iter_create())
+        assert len(results) == len(factory.primary_keys) == 7
+        assert {identifier.class_name for identifier, _, _ in results} == {
+            model.__name__ for model in MODELS}
+
+        # only the primary keys are kept around
+        assert not any(factory.model_instances.values())
+        assert not loader.model_fixtures
+        alice = session.query(Author).filter_by(name='Alice').one()
+        assert factory.primary_keys[Identifier('Author', 'alice')] == alice.id
+        _assert_loaded(session)
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_batch_size_and_commit_every(bulk):
+    engine = create_engine('sqlite:///:memory:')
+    BaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    commits = []
+    event.listen(session, 'after_commit', lambda session: commits.append(session))
+    factory = SQLAlchemyModelFactory(session, MODELS, bulk=bulk,
+                                     batch_size=1, commit_every=2)
+    loader = FixturesLoader(factory, fixture_dirs=[BULK_FIXTURES_DIR])
+    assert len(list(loader.iter_create())) == 7
+
+    # a commit after every 2 of the 7 rows, plus the final one
+    assert len(commits) == 4
+    _assert_loaded(session)
+
+
+def test_stats():
+    engine = create_engine('sqlite:///:memory:')
+    BaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    factory = SQLAlchemyModelFactory(session, MODELS, bulk=True)
+    loader = FixturesLoader(factory, fixture_dirs=[BULK_FIXTURES_DIR], stats=LoaderStats())
+    loader.create_all()
+
+    filepath = os.path.join(BULK_FIXTURES_DIR, 'fixtures.yml')
+    assert loader.stats.timings['parse', filepath].rows == 7
+    assert {name for phase, name in loader.stats.timings if phase == 'write'} == {
+        model.__name__ for model in MODELS}
+
+    assert loader.stats.by_phase()['write'].rows == 7
+    assert sum(timing.statements for timing in loader.stats.by_phase().values()) \
+        == len(statements)
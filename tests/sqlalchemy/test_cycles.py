@@ -0,0 +1,91 @@
+import os
+import pytest
+import sqlalchemy as sa
+
+from py_yaml_fixtures import FixturesLoader
+from py_yaml_fixtures.factories.sqlalchemy import SQLAlchemyModelFactory
+from py_yaml_fixtures.types import Identifier
+from py_yaml_fixtures.utils import CircularDependencyError
+from sqlalchemy import create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship, sessionmaker
+
+CYCLES_FIXTURES_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'cycles')
+
+
+BaseModel = declarative_base()
+
+
+class Category(BaseModel):
+    __tablename__ = 'category'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String, unique=True)
+    parent_id = sa.Column(sa.Integer, sa.ForeignKey('category.id'))
+    parent = relationship('Category', remote_side=[id])
+
+
+class User(BaseModel):
+    __tablename__ = 'user'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String, unique=True)
+    favorite_post_id = sa.Column(sa.Integer, sa.ForeignKey('post.id'))
+    # the unit of work needs post_update for mutually dependent rows (bulk mode doesn't)
+    favorite_post = relationship('Post', foreign_keys=[favorite_post_id],
+                                 post_update=True)
+
+
+class Post(BaseModel):
+    __tablename__ = 'post'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    title = sa.Column(sa.String, unique=True)
+    author_id = sa.Column(sa.Integer, sa.ForeignKey('user.id'), nullable=False)
+    author = relationship('User', foreign_keys=[author_id])
+    category_id = sa.Column(sa.Integer, sa.ForeignKey('category.id'))
+    category = relationship('Category')
+
+
+MODELS = [Category, User, Post]
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_self_referential_and_circular_foreign_keys(bulk):
+    engine = create_engine('sqlite:///:memory:')
+    BaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    for _ in range(2):  # the second time updates the existing rows
+        factory = SQLAlchemyModelFactory(session, MODELS, bulk=bulk)
+        loader = FixturesLoader(factory, fixture_dirs=[CYCLES_FIXTURES_DIR])
+        loader.create_all()
+        session.expire_all()
+
+        assert loader.identifier_graph[Identifier('Category', 'python')] == {
+            'parent': [Identifier('Category', 'programming')]}
+
+        assert session.query(Category).count() == 3
+        python = session.query(Category).filter_by(name='Python').one()
+        assert python.parent.name == 'Programming'
+        assert python.parent.parent.name == 'Root'
+        assert python.parent.parent.parent is None
+
+        alice = session.query(User).one()
+        post = session.query(Post).one()
+        assert post.author == alice
+        assert post.category == python
+        assert alice.favorite_post == post
+
+
+def test_circular_dependency_between_required_columns():
+    class Factory(SQLAlchemyModelFactory):
+        def can_defer(self, class_name, column):
+            return False
+
+    session = sessionmaker(bind=create_engine('sqlite:///:memory:'))()
+    loader = FixturesLoader(Factory(session, MODELS), fixture_dirs=[CYCLES_FIXTURES_DIR])
+    with pytest.raises(CircularDependencyError) as e:
+        loader.create_all()
+    assert str(e.value) == ('Circular dependency detected between models: '
+                            'Category -> Category')
@@ -0,0 +1,130 @@
+import os
+import pytest
+import shutil
+import sqlalchemy as sa
+
+from py_yaml_fixtures import FixturesLoader
+from py_yaml_fixtures.factories.sqlalchemy import SQLAlchemyModelFactory
+from py_yaml_fixtures.types import Identifier
+from sqlalchemy import create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship, sessionmaker
+
+from .test_bulk import (Article, BaseModel, BULK_FIXTURES_DIR, Comment, MODELS,
+                        _assert_loaded)
+
+
+# models without unique columns, which get looked up by their values
+ChainBaseModel = declarative_base()
+
+
+class Parent(ChainBaseModel):
+    __tablename__ = 'parent'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String)
+
+
+class Child(ChainBaseModel):
+    __tablename__ = 'child'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String)
+    parent_id = sa.Column(sa.Integer, sa.ForeignKey('parent.id'))
+    parent = relationship('Parent')
+
+
+class Toy(ChainBaseModel):
+    __tablename__ = 'toy'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String)
+    child_id = sa.Column(sa.Integer, sa.ForeignKey('child.id'))
+    child = relationship('Child')
+
+
+CHAIN_MODELS = [Parent, Child, Toy]
+CHAIN_FIXTURES = (
+    'Parent:\n  p1:\n    name: Parent\n'
+    'Child:\n  c1:\n    name: Child\n    parent: Parent(p1)\n'
+    'Toy:\n  t1:\n    name: Toy\n    child: Child(c1)\n'
+)
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_incremental_loading(tmp_path, bulk):
+    engine = create_engine('sqlite:///:memory:')
+    BaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    fixtures_dir = str(tmp_path / 'fixtures')
+    shutil.copytree(BULK_FIXTURES_DIR, fixtures_dir)
+    fixtures_path = os.path.join(fixtures_dir, 'fixtures.yml')
+    manifest_path = str(tmp_path / 'manifest.pickle')
+
+    def load():
+        factory = SQLAlchemyModelFactory(session, MODELS, bulk=bulk)
+        loader = FixturesLoader(factory, fixture_dirs=[fixtures_dir],
+                                manifest_path=manifest_path)
+        return [identifier for identifier, _, _ in loader.iter_create()]
+
+    assert len(load()) == 7
+    _assert_loaded(session)
+
+    # nothing changed
+    assert load() == []
+    _assert_loaded(session)
+
+    # the changed article gets updated, and so does the author listing it
+    with open(fixtures_path) as f:
+        fixtures = f.read()
+    with open(fixtures_path, 'w') as f:
+        f.write(fixtures.replace('tags: [Tag(sql)]', 'tags: [Tag(python)]'))
+    assert sorted(load(), key=repr) == [Identifier('Article', 'bye'),
+                                        Identifier('Author', 'alice')]
+    session.expire_all()
+    bye = session.query(Article).filter_by(title='Bye').one()
+    assert [tag.name for tag in bye.tags] == ['Python']
+    assert bye.author.name == 'Alice'
+
+    # a new row referring to an unchanged one
+    with open(fixtures_path, 'a') as f:
+        f.write('  c3:\n'
+                '    body: Third!\n'
+                '    article: Article(hello)\n')
+    assert load() == [Identifier('Comment', 'c3')]
+    c3 = session.query(Comment).filter_by(body='Third!').one()
+    assert c3.article.title == 'Hello'
+    assert session.query(Comment).count() == 3
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_incremental_loading_follows_indirect_dependents(tmp_path, bulk):
+    engine = create_engine('sqlite:///:memory:')
+    ChainBaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    fixtures_dir = str(tmp_path / 'fixtures')
+    os.mkdir(fixtures_dir)
+    fixtures_path = os.path.join(fixtures_dir, 'fixtures.yml')
+    with open(fixtures_path, 'w') as f:
+        f.write(CHAIN_FIXTURES)
+
+    def load():
+        factory = SQLAlchemyModelFactory(session, CHAIN_MODELS, bulk=bulk)
+        loader = FixturesLoader(factory, fixture_dirs=[fixtures_dir],
+                                manifest_path=str(tmp_path / 'manifest.pickle'))
+        return [identifier for identifier, _, _ in loader.iter_create()]
+
+    assert len(load()) == 3
+
+    # the edited parent is looked up by its values, so it becomes a new row,
+    # and so does the child referring to it: the toy has to follow along
+    with open(fixtures_path, 'w') as f:
+        f.write(CHAIN_FIXTURES.replace('name: Parent', 'name: Edited'))
+    assert load() == [Identifier('Parent', 'p1'), Identifier('Child', 'c1'),
+                      Identifier('Toy', 't1')]
+    session.expire_all()
+    toy = session.query(Toy).order_by(Toy.id.desc()).first()
+    assert toy.child.id == session.query(sa.func.max(Child.id)).scalar()
+    assert toy.child.parent.name == 'Edited'
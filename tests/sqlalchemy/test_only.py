@@ -0,0 +1,59 @@
+import os
+import pytest
+import yaml
+
+from py_yaml_fixtures import FixturesLoader
+from py_yaml_fixtures.factories.sqlalchemy import SQLAlchemyModelFactory
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from .test_bulk import (Article, Author, BaseModel, BULK_FIXTURES_DIR, Comment, MODELS,
+                        Tag)
+
+
+@pytest.fixture()
+def fixtures_dir(tmp_path):
+    # split the fixtures into a file per model class
+    with open(os.path.join(BULK_FIXTURES_DIR, 'fixtures.yml')) as f:
+        fixtures = yaml.safe_load(f)
+    for class_name, class_data in fixtures.items():
+        with open(str(tmp_path / (class_name + '.yml')), 'w') as f:
+            yaml.safe_dump(class_data, f)
+
+    # rendering this one would fail
+    with open(str(tmp_path / 'Unrelated.yml'), 'w') as f:
+        f.write('{{ does_not_exist() }}\n')
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_only(fixtures_dir, bulk):
+    engine = create_engine('sqlite:///:memory:')
+    BaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    factory = SQLAlchemyModelFactory(session, MODELS, bulk=bulk)
+    loader = FixturesLoader(factory, fixture_dirs=[fixtures_dir])
+    rv = loader.create_all(only=['Comment'])
+
+    # the comments, the article they're on, and its tags
+    assert set(rv) == {'c1', 'c2', 'hello', 'python', 'sql'}
+    assert set(loader._file_cache) == {os.path.join(fixtures_dir, class_name + '.yml')
+                                       for class_name in ['Comment', 'Article', 'Tag']}
+    assert session.query(Comment).count() == 2
+    assert [article.title for article in session.query(Article)] == ['Hello']
+    assert session.query(Tag).count() == 2
+    assert session.query(Author).count() == 0
+
+    # the data for the selected models doesn't get reused for loading the rest
+    os.remove(os.path.join(fixtures_dir, 'Unrelated.yml'))
+    loader.reset()
+    assert len(loader.create_all()) == 7
+    assert session.query(Article).count() == 2
+
+
+def test_only_unknown_model_class(fixtures_dir):
+    factory = SQLAlchemyModelFactory(None, MODELS)
+    loader = FixturesLoader(factory, fixture_dirs=[fixtures_dir])
+    with pytest.raises(ValueError):
+        loader.create_all(only=['Nope'])
@@ -0,0 +1,76 @@
+import pytest
+
+from py_yaml_fixtures import FixturesLoader
+from py_yaml_fixtures.factories.sqlalchemy import SQLAlchemyModelFactory
+from py_yaml_fixtures.types import Identifier
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from .test_bulk import (Article, Author, BaseModel, BULK_FIXTURES_DIR, Comment, MODELS,
+                        Tag, _assert_loaded)
+
+pytest_plugins = ['py_yaml_fixtures.pytest_plugin']
+
+
+def _dump(engine):
+    with engine.connect() as conn:
+        return {table.name: sorted(conn.execute(table.select()).fetchall())
+                for table in BaseModel.metadata.sorted_tables}
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_snapshot(tmp_path, bulk):
+    engine = create_engine('sqlite:///' + str(tmp_path / 'db.sqlite'))
+    BaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    factory = SQLAlchemyModelFactory(session, MODELS, bulk=bulk)
+    loader = FixturesLoader(factory, fixture_dirs=[BULK_FIXTURES_DIR])
+    snapshot = loader.create_snapshot(str(tmp_path / 'snapshot.pickle'))
+    assert list(snapshot.tables) == ['tag', 'article', 'author', 'comment', 'article_tags']
+    loaded = _dump(engine)
+
+    # mess up the database
+    session.query(Comment).delete()
+    session.add(Tag(name='Rust'))
+    session.query(Author).one().name = 'Mallory'
+    session.commit()
+
+    # restore it in a new loader (eg in another process)
+    factory = SQLAlchemyModelFactory(session, MODELS, bulk=bulk)
+    loader = FixturesLoader(factory, fixture_dirs=[BULK_FIXTURES_DIR])
+    primary_keys = loader.restore_snapshot(snapshot.path)
+    assert _dump(engine) == loaded
+    _assert_loaded(session)
+
+    alice = session.query(Author).filter_by(name='Alice').one()
+    assert primary_keys[Identifier('Author', 'alice')] == alice.id
+    assert primary_keys == snapshot.primary_keys
+    assert loader.fingerprint() == snapshot.fingerprint
+
+
+@pytest.fixture(scope='session')
+def py_yaml_fixtures_loader():
+    engine = create_engine('sqlite:///:memory:')
+    BaseModel.metadata.create_all(bind=engine)
+    factory = SQLAlchemyModelFactory(sessionmaker(bind=engine)(), MODELS)
+    return FixturesLoader(factory, fixture_dirs=[BULK_FIXTURES_DIR])
+
+
+@pytest.mark.parametrize('run', [1, 2])
+def test_pytest_plugin(py_yaml_fixtures_loader, py_yaml_fixtures, run):
+    session = py_yaml_fixtures_loader.factory.session
+    _assert_loaded(session)
+    hello = session.query(Article).get(py_yaml_fixtures[Identifier('Article', 'hello')])
+    assert hello.title == 'Hello'
+
+    # the next test shouldn't see this
+    session.query(Comment).delete()
+    session.commit()
+
+
+def test_restore_missing_snapshot(tmp_path):
+    factory = SQLAlchemyModelFactory(None, MODELS)
+    loader = FixturesLoader(factory, fixture_dirs=[BULK_FIXTURES_DIR])
+    with pytest.raises(ValueError):
+        loader.restore_snapshot(str(tmp_path / 'nope.pickle'))
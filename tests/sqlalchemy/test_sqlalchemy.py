@@ -1,8 +1,14 @@
 import os
+import random
 import sqlalchemy as sa
+import yaml
+
+from datetime import date, datetime, time, timedelta, timezone
 
 from py_yaml_fixtures import FixturesLoader
+from py_yaml_fixtures.cache import RenderCache
 from py_yaml_fixtures.factories.sqlalchemy import SQLAlchemyModelFactory
+from py_yaml_fixtures.types import Identifier
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
@@ -10,6 +16,8 @@ from sqlalchemy.orm import relationship, sessionmaker
 SQLA_TEST_DIR = os.path.abspath(os.path.dirname(__file__))
 CREATE_MODELS_FIXTURES_DIR = os.path.join(SQLA_TEST_DIR, 'create')
 UPDATE_MODELS_FIXTURES_DIR = os.path.join(SQLA_TEST_DIR, 'update')
+RANDOM_MODELS_FIXTURES_DIR = os.path.join(SQLA_TEST_DIR, 'random')
+PARALLEL_FIXTURES_DIR = os.path.join(SQLA_TEST_DIR, 'parallel')
 
 
 BaseModel = declarative_base()
@@ -32,6 +40,19 @@ class Child(BaseModel):
     parent = relationship('Parent', back_populates='children')
 
 
+class Event(BaseModel):
+    __tablename__ = 'event'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String)
+    day = sa.Column(sa.Date)
+    starts_at = sa.Column(sa.DateTime)
+    doors_open = sa.Column(sa.Time)
+    duration = sa.Column(sa.Interval)
+    parent_id = sa.Column(sa.Integer, sa.ForeignKey('parent.id'))
+    parent = relationship('Parent')
+
+
 engine = create_engine('sqlite:///:memory:')
 BaseModel.metadata.create_all(bind=engine)
 
@@ -71,3 +92,134 @@ def test_sqlalchemy_update():
     second_child = session.query(Child).filter_by(name='Second Child').one()
 
     assert parent.children == [first_child, second_child]
+
+
+def test_random_models_resolved_after_single_render():
+    loader = FixturesLoader(factory, fixture_dirs=[RANDOM_MODELS_FIXTURES_DIR])
+    loader._load_data()
+
+    child_keys = set(loader.model_fixtures['Child'])
+    assert child_keys == {'c0', 'c1', 'c2', 'c3', 'c4'}
+    for data in loader.model_fixtures['Parent'].values():
+        assert 1 <= len(data['children']) <= 2
+        for identifier in data['children']:
+            assert identifier.class_name == 'Child'
+            assert identifier.key in child_keys
+
+    reloaded = FixturesLoader(factory, fixture_dirs=[RANDOM_MODELS_FIXTURES_DIR])
+    reloaded._load_data()
+    assert reloaded.model_fixtures == loader.model_fixtures
+
+
+def test_parallel_rendering_matches_serial():
+    serial = FixturesLoader(factory, fixture_dirs=[PARALLEL_FIXTURES_DIR])
+    serial._load_data()
+
+    parallel = FixturesLoader(factory, fixture_dirs=[PARALLEL_FIXTURES_DIR], workers=2)
+    parallel._load_data()
+
+    assert len(serial.model_fixtures['Parent']) == 15
+    assert parallel.model_fixtures == serial.model_fixtures
+    assert parallel.relationships == serial.relationships
+
+
+def test_rendering_doesnt_depend_on_order_or_global_random():
+    random.seed(1)
+    loader = FixturesLoader(factory, fixture_dirs=[PARALLEL_FIXTURES_DIR])
+    loader._load_data()
+
+    random.seed(2)
+    reversed_order = FixturesLoader(factory, fixture_dirs=[PARALLEL_FIXTURES_DIR])
+    reversed_order._filepaths = list(reversed(reversed_order.find_fixture_files()))
+    reversed_order._load_data()
+    assert reversed_order.model_fixtures == loader.model_fixtures
+
+    reseeded = FixturesLoader(factory, fixture_dirs=[PARALLEL_FIXTURES_DIR], seed=1)
+    reseeded._load_data()
+    assert reseeded.model_fixtures != loader.model_fixtures
+
+
+def test_faker_unique_doesnt_depend_on_order(tmp_path):
+    template = ('{%% for i in range(3) %%}%s{{ i }}:\n'
+                '  name: "{{ faker.unique.random_int(0, 5) }}"\n{%% endfor %%}')
+    for class_name in ['Parent', 'Child']:
+        with open(str(tmp_path / (class_name + '.yml')), 'w') as f:
+            f.write(template % class_name.lower())
+
+    serial = FixturesLoader(factory, fixture_dirs=[str(tmp_path)])
+    serial._load_data()
+
+    parallel = FixturesLoader(factory, fixture_dirs=[str(tmp_path)], workers=2)
+    parallel._load_data()
+    assert parallel.model_fixtures == serial.model_fixtures
+
+    reversed_order = FixturesLoader(factory, fixture_dirs=[str(tmp_path)])
+    reversed_order._filepaths = list(reversed(reversed_order.find_fixture_files()))
+    reversed_order._load_data()
+    assert reversed_order.model_fixtures == serial.model_fixtures
+
+
+def test_yaml_loader_option():
+    default = FixturesLoader(factory, fixture_dirs=[PARALLEL_FIXTURES_DIR])
+    assert default.yaml_loader is getattr(yaml, 'CFullLoader', yaml.FullLoader)
+    default._load_data()
+
+    pure_python = FixturesLoader(factory, fixture_dirs=[PARALLEL_FIXTURES_DIR],
+                                 yaml_loader=yaml.SafeLoader)
+    pure_python._load_data()
+    assert pure_python.model_fixtures == default.model_fixtures
+
+
+def test_rendered_fixtures_cache(tmp_path, monkeypatch):
+    loader = FixturesLoader(factory, fixture_dirs=[PARALLEL_FIXTURES_DIR],
+                            cache_dir=str(tmp_path))
+    loader._load_data()
+
+    def fail(*args, **kwargs):
+        raise AssertionError('should have been loaded from the cache')
+
+    monkeypatch.setattr(FixturesLoader, '_render_yaml', fail)
+    cached = FixturesLoader(factory, fixture_dirs=[PARALLEL_FIXTURES_DIR],
+                            cache_dir=str(tmp_path))
+    cached._load_data()
+    assert cached.model_fixtures == loader.model_fixtures
+
+
+def test_rendered_fixtures_cache_evicts_once_per_load(tmp_path, monkeypatch):
+    evictions = []
+    monkeypatch.setattr(RenderCache, 'evict', lambda self: evictions.append(self))
+    loader = FixturesLoader(factory, fixture_dirs=[PARALLEL_FIXTURES_DIR],
+                            cache_dir=str(tmp_path))
+    loader._load_data()
+    assert len(loader.find_fixture_files()) > 1
+    assert evictions == [loader.cache]
+
+
+def test_maybe_convert_values():
+    factory = SQLAlchemyModelFactory(session, models=[Parent, Child, Event])
+    loader = FixturesLoader(factory, fixture_dirs=[CREATE_MODELS_FIXTURES_DIR])
+    loader.create_all()
+
+    data = {'name': 'Party', 'day': '2020-01-02', 'starts_at': '2020-01-02T20:00:00Z',
+            'doors_open': '19:30', 'duration': '3 hours',
+            'parent': Identifier('Parent', 'p1')}
+    for _ in range(2):  # the second time uses the cached conversion plan
+        assert factory.maybe_convert_values(Identifier('Event', 'party'), data) == {
+            'name': 'Party',
+            'day': date(2020, 1, 2),
+            'starts_at': datetime(2020, 1, 2, 20, tzinfo=timezone.utc),
+            'doors_open': time(19, 30),
+            'duration': timedelta(hours=3),
+            'parent': session.query(Parent).filter_by(name='First Parent').one(),
+        }
+
+
+def test_date_formats():
+    factory = SQLAlchemyModelFactory(session, models=[Parent, Child, Event],
+                                     date_formats={'Event.day': '%d/%m/%Y',
+                                                   'Event.starts_at': '%d/%m/%Y %H:%M'})
+    data = {'day': '02/01/2020', 'starts_at': '02/01/2020 20:00'}
+    assert factory.maybe_convert_values(Identifier('Event', 'party'), data) == {
+        'day': date(2020, 1, 2),
+        'starts_at': datetime(2020, 1, 2, 20),
+    }
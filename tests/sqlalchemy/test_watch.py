@@ -0,0 +1,101 @@
+import os
+import shutil
+import threading
+import time
+
+from py_yaml_fixtures import FactoryInterface, FixturesLoader
+from py_yaml_fixtures.factories.sqlalchemy import SQLAlchemyModelFactory
+from py_yaml_fixtures.watch import FixturesWatcher, watch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from .test_bulk import Article, Author, BaseModel, BULK_FIXTURES_DIR, MODELS
+from .test_incremental import (CHAIN_FIXTURES, CHAIN_MODELS, ChainBaseModel, Child,
+                               Toy)
+
+
+def test_polling_watcher(tmp_path):
+    fixtures_path = str(tmp_path / 'Model.yml')
+    with open(fixtures_path, 'w') as f:
+        f.write('a: {name: A}\n')
+    os.mkdir(str(tmp_path / 'drafts'))
+
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[str(tmp_path)],
+                            recursive=True, exclude=['drafts'])
+    watcher = FixturesWatcher(loader, poll_interval=0.01, debounce=0.01,
+                              use_watchdog=False)
+    changes = watcher.changes()
+
+    def create_files():
+        # files the loader wouldn't load don't count as changes
+        for path in [tmp_path / 'drafts' / 'Draft.yml', tmp_path / 'notes.txt']:
+            open(str(path), 'w').close()
+        time.sleep(0.1)
+        open(str(tmp_path / 'New.yml'), 'w').close()
+
+    threading.Timer(0.1, create_files).start()
+    assert next(changes) == {str(tmp_path / 'New.yml')}
+
+
+def test_watch(tmp_path):
+    engine = create_engine('sqlite:///:memory:')
+    BaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    fixtures_dir = str(tmp_path / 'fixtures')
+    shutil.copytree(BULK_FIXTURES_DIR, fixtures_dir)
+    fixtures_path = os.path.join(fixtures_dir, 'fixtures.yml')
+
+    def edit_fixtures():
+        time.sleep(0.2)
+        with open(fixtures_path) as f:
+            fixtures = f.read()
+        with open(fixtures_path, 'w') as f:
+            f.write(fixtures.replace('tags: [Tag(sql)]', 'tags: [Tag(python)]'))
+
+    loaded, messages = [], []
+    factory = SQLAlchemyModelFactory(session, MODELS)
+    loader = FixturesLoader(factory, fixture_dirs=[fixtures_dir])
+    threading.Thread(target=edit_fixtures).start()
+    watch(loader, lambda identifier, model, created: loaded.append(identifier.key),
+          echo=messages.append, max_reloads=1,
+          poll_interval=0.05, debounce=0.05, use_watchdog=False)
+
+    # everything gets loaded the first time, then only the changed article
+    # (and the author referring to it)
+    assert len(loaded) == 9 and sorted(loaded[7:]) == ['alice', 'bye']
+    assert messages[-1] == 'Loaded fixtures (2 created or updated)'
+    session.expire_all()
+    bye = session.query(Article).filter_by(title='Bye').one()
+    assert [tag.name for tag in bye.tags] == ['Python']
+    assert session.query(Author).count() == 1
+
+
+def test_watch_rewrites_grandchildren(tmp_path):
+    engine = create_engine('sqlite:///:memory:')
+    ChainBaseModel.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    fixtures_path = str(tmp_path / 'fixtures.yml')
+    with open(fixtures_path, 'w') as f:
+        f.write(CHAIN_FIXTURES)
+
+    def edit_fixtures():
+        time.sleep(0.2)
+        with open(fixtures_path, 'w') as f:
+            f.write(CHAIN_FIXTURES.replace('name: Parent', 'name: Edited'))
+
+    loaded = []
+    factory = SQLAlchemyModelFactory(session, CHAIN_MODELS)
+    loader = FixturesLoader(factory, fixture_dirs=[str(tmp_path)])
+    threading.Thread(target=edit_fixtures).start()
+    watch(loader, lambda identifier, model, created: loaded.append(identifier.key),
+          echo=lambda message: None, max_reloads=1,
+          poll_interval=0.05, debounce=0.05, use_watchdog=False)
+
+    # the edited parent becomes a new row, and so do its child and grandchild
+    assert loaded == ['p1', 'c1', 't1'] * 2
+    session.expire_all()
+    toy = session.query(Toy).order_by(Toy.id.desc()).first()
+    assert toy.child.id == session.query(Child).order_by(Child.id.desc()).first().id
+    assert toy.child.parent.name == 'Edited'
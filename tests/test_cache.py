@@ -0,0 +1,30 @@
+import os
+
+from py_yaml_fixtures.cache import RenderCache
+
+
+def test_render_cache(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    key = cache.make_key('source', 'Model.yml', 1234)
+    assert key != cache.make_key('changed source', 'Model.yml', 1234)
+    assert key != cache.make_key('source', 'Model.yml', 4321)
+
+    assert cache.get(key) is None
+    cache.set(key, {'Model': {'a': {'name': 'A'}}})
+    assert cache.get(key) == {'Model': {'a': {'name': 'A'}}}
+
+
+def test_render_cache_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path), max_size=3500)
+    for i in range(3):
+        cache.set(str(i), 'x' * 1000)
+        os.utime(os.path.join(str(tmp_path), '{}.pickle'.format(i)), (i, i))
+
+    # reading an entry marks it as recently used
+    assert cache.get('0') is not None
+    cache.set('3', 'x' * 1000)
+    cache.evict()
+
+    assert cache.get('1') is None
+    for key in ['0', '2', '3']:
+        assert cache.get(key) is not None
@@ -0,0 +1,168 @@
+import os
+import pytest
+import random
+import shutil
+
+from py_yaml_fixtures import FixturesLoader
+from py_yaml_fixtures.factories import FactoryInterface
+
+
+def _write_files(root, files):
+    for relpath, source in files.items():
+        path = os.path.join(root, *relpath.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(source)
+
+
+def _relpaths(root, paths):
+    return [os.path.relpath(path, root).replace(os.sep, '/') for path in paths]
+
+
+def test_find_fixture_files(tmp_path):
+    root = str(tmp_path)
+    _write_files(root, {
+        'User.yml': 'alice: {}\n',
+        'users.v2.yml': 'User:\n  bob: {}\nGroup:\n  admins: {}\n',
+        'README.md': '',
+        'blog/Article.yml': 'hello: {}\n',
+        'blog/Article.2020.yaml': 'bye: {}\n',
+        'blog/drafts/Article.yml': 'draft: {}\n',
+        'shop/fixtures.yml': 'Product:\n  book:\n    name: Book\n',
+    })
+
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[root])
+    assert _relpaths(root, loader.find_fixture_files()) == ['User.yml', 'users.v2.yml']
+
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[root], recursive=True)
+    assert _relpaths(root, loader.find_fixture_files()) == [
+        'User.yml',
+        'blog/Article.2020.yaml',
+        'blog/Article.yml',
+        'blog/drafts/Article.yml',
+        'shop/fixtures.yml',
+        'users.v2.yml',
+    ]
+
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[root], recursive=True,
+                            include=['blog/*', 'User.yml'], exclude=['*/drafts'])
+    assert _relpaths(root, loader.find_fixture_files()) == [
+        'User.yml', 'blog/Article.2020.yaml', 'blog/Article.yml']
+
+
+def test_class_index(tmp_path):
+    root = str(tmp_path)
+    _write_files(root, {
+        'User.yml': 'alice: {}\n',
+        'users.v2.yml': 'User:\n  bob: {}\n\nGroup:\n  admins: {}\n',
+        'blog/Article.yml': 'hello: {}\n',
+        'blog/Article.2020.yml': 'bye: {}\n',
+    })
+
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[root], recursive=True)
+    assert {class_name: _relpaths(root, paths)
+            for class_name, paths in loader.class_index.items()} == {
+        'User': ['User.yml', 'users.v2.yml'],
+        'Article': ['blog/Article.2020.yml', 'blog/Article.yml'],
+        'Group': ['users.v2.yml'],
+    }
+
+    # only the multi-class file had to be read
+    assert _relpaths(root, loader._file_cache) == ['users.v2.yml']
+
+    # and the class names of sharded files don't include the shard name
+    data, _ = loader._render_yaml(os.path.join(root, 'blog', 'Article.2020.yml'))
+    assert data == {'Article': {'bye': {}}}
+
+
+def test_template_names_and_bytecode_cache(tmp_path, monkeypatch):
+    root = str(tmp_path / 'checkout')
+    _write_files(root, {
+        'app/fixtures/User.yml': '{% for i in range(2) %}user{{ i }}: {}\n{% endfor %}',
+        'blog/fixtures/Article.yml': 'hello: {}\n',
+    })
+    fixture_dirs = [os.path.join(root, 'app', 'fixtures'),
+                    os.path.join(root, 'blog', 'fixtures')]
+    bytecode_cache_dir = str(tmp_path / 'bytecode')
+
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=fixture_dirs,
+                            bytecode_cache_dir=bytecode_cache_dir)
+    assert [loader.template_name(path) for path in loader.find_fixture_files()] == [
+        'app/fixtures/User.yml', 'blog/fixtures/Article.yml']
+    for path in loader.find_fixture_files():
+        loader._render_yaml(path)
+    assert len(os.listdir(bytecode_cache_dir)) == 2
+
+    # the compiled templates get reused after moving the fixture directories
+    moved = str(tmp_path / 'moved')
+    shutil.move(root, moved)
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[
+        os.path.join(moved, 'app', 'fixtures'), os.path.join(moved, 'blog', 'fixtures')],
+        bytecode_cache_dir=bytecode_cache_dir)
+
+    def compile(*args, **kwargs):
+        pytest.fail('the template should have been loaded from the bytecode cache')
+
+    monkeypatch.setattr(loader.env, 'compile', compile)
+    data, _ = loader._render_yaml(os.path.join(moved, 'app', 'fixtures', 'User.yml'))
+    assert data == {'User': {'user0': {}, 'user1': {}}}
+
+
+def test_template_names_dont_depend_upon_other_fixture_dirs(tmp_path):
+    root = str(tmp_path)
+    _write_files(root, {
+        'app/fixtures/User.yml': 'alice: {}\n',
+        'blog/fixtures/Article.yml': 'hello: {}\n',
+        'vendor/app/fixtures/User.yml': 'bob: {}\n',
+    })
+    app_dir = os.path.join(root, 'app', 'fixtures')
+    blog_dir = os.path.join(root, 'blog', 'fixtures')
+    user_path = os.path.join(app_dir, 'User.yml')
+
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[app_dir])
+    assert loader.template_name(user_path) == 'app/fixtures/User.yml'
+
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[app_dir, blog_dir])
+    assert [loader.template_name(path) for path in loader.find_fixture_files()] == [
+        'app/fixtures/User.yml', 'blog/fixtures/Article.yml']
+
+    # fixture dirs with the same names still render their own files
+    vendor_dir = os.path.join(root, 'vendor', 'app', 'fixtures')
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[app_dir, vendor_dir])
+    assert [loader._render_yaml(path)[0] for path in loader.find_fixture_files()] == [
+        {'User': {'alice': {}}}, {'User': {'bob': {}}}]
+
+
+def test_random_filter_is_seeded_per_file(tmp_path):
+    root = str(tmp_path)
+    _write_files(root, {
+        'Item.yml': '{% for i in range(5) %}i{{ i }}: {n: {{ range(1000)|random }}}\n{% endfor %}',
+    })
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[root])
+    path = os.path.join(root, 'Item.yml')
+
+    random.seed(1)
+    data, _ = loader._render_yaml(path)
+    assert len({item['n'] for item in data['Item'].values()}) > 1
+
+    random.seed(2)
+    assert loader._render_yaml(path)[0] == data
+
+
+def test_output_doesnt_depend_upon_other_fixture_dirs(tmp_path):
+    root = str(tmp_path)
+    _write_files(root, {
+        'app/fixtures/Item.yml': ('{% for i in range(5) %}i{{ i }}:\n'
+                                  '  name: {{ faker.name() }}\n'
+                                  '  n: {{ range(1000)|random }}\n{% endfor %}'),
+        'blog/fixtures/Article.yml': 'hello: {}\n',
+    })
+    app_dir = os.path.join(root, 'app', 'fixtures')
+    path = os.path.join(app_dir, 'Item.yml')
+
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[app_dir])
+    data, _ = loader._render_yaml(path)
+
+    loader = FixturesLoader(FactoryInterface(), fixture_dirs=[
+        app_dir, os.path.join(root, 'blog', 'fixtures')])
+    assert loader._render_yaml(path)[0] == data
@@ -0,0 +1,36 @@
+from py_yaml_fixtures.stats import LoaderStats, Timing
+
+
+def test_loader_stats():
+    stats = LoaderStats()
+    for name in ['Parent', 'Child', 'Parent']:
+        with stats.measure('write', name) as timing:
+            stats.count_statement()
+            timing.rows += 2
+    with stats.measure('render', 'Parent.yml'):
+        pass
+
+    assert stats.timings['write', 'Parent'].calls == 2
+    assert stats.timings['write', 'Parent'].rows == 4
+    assert stats.timings['write', 'Parent'].statements == 2
+
+    # the phases are in pipeline order
+    by_phase = stats.by_phase()
+    assert list(by_phase) == ['render', 'write']
+    assert by_phase['write'].rows == 6
+    assert by_phase['write'].statements == 3
+
+
+def test_loader_stats_summary():
+    stats = LoaderStats()
+    stats.add('write', 'Parent', Timing(wall=1.5, cpu=0.5, rows=10, statements=3))
+    stats.add('commit', None, Timing(wall=0.25, cpu=0.125, statements=1))
+
+    assert stats.summary().splitlines() == [
+        'phase   name    wall (s)  cpu (s)  rows  sql',
+        '------  ------  --------  -------  ----  ---',
+        'write              1.500    0.500    10    3',
+        '        Parent     1.500    0.500    10    3',
+        'commit             0.250    0.125     0    1',
+    ]
+    assert len(stats.summary(detailed=False).splitlines()) == 4
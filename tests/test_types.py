@@ -0,0 +1,36 @@
+import pickle
+import pytest
+
+from py_yaml_fixtures.types import Identifier
+
+
+def test_identifier():
+    identifier = Identifier('Model', 'key')
+    assert identifier.class_name == 'Model'
+    assert identifier.key == 'key'
+    assert list(identifier) == ['Model', 'key']
+    assert repr(identifier) == 'Model(key)'
+
+    assert identifier == Identifier('Model', 'key')
+    assert identifier != Identifier('Model', 'other')
+    assert identifier != Identifier('Other', 'key')
+    assert identifier != ('Model', 'key')
+
+
+def test_identifier_is_hashable_and_interned():
+    identifier = Identifier('Model', 'key')
+    assert Identifier('Model', 'key') is identifier
+    assert {identifier: 1}[Identifier('Model', 'key')] == 1
+    assert len({identifier, Identifier('Model', 'key'), Identifier('Model', 1)}) == 2
+
+    assert pickle.loads(pickle.dumps(identifier)) is identifier
+
+
+def test_identifier_is_immutable():
+    identifier = Identifier('Model', 'key')
+    with pytest.raises(AttributeError):
+        identifier.key = 'other'
+    with pytest.raises(AttributeError):
+        identifier.foo = 'bar'
+    with pytest.raises(AttributeError):
+        del identifier.key
@@ -1,7 +1,12 @@
 import datetime as dt
+import pytest
 
+from py_yaml_fixtures import utils
 from py_yaml_fixtures.types import Identifier
-from py_yaml_fixtures.utils import date_factory, datetime_factory, normalize_identifiers
+from py_yaml_fixtures.utils import (CircularDependencyError, date_factory, datetime_factory,
+                                    normalize_identifiers, normalize_identifiers_bulk,
+                                    load_pickle, parse_model_names, save_pickle,
+                                    topological_levels, topological_sort)
 
 
 def test_date_factory():
@@ -34,6 +39,26 @@ def test_datetime_factory():
         assert datetime_factory(shortcut) - dt.datetime.now(dt.timezone.utc) < dt.timedelta(seconds=1)
 
 
+def test_datetime_factory_parsing():
+    utc = dt.timezone.utc
+    assert datetime_factory('2020-01-02') == dt.datetime(2020, 1, 2)
+    assert datetime_factory('2020-01-02T03:04:05') == dt.datetime(2020, 1, 2, 3, 4, 5)
+    assert datetime_factory('2020-01-02 03:04:05+00:00') == dt.datetime(2020, 1, 2, 3, 4, 5,
+                                                                       tzinfo=utc)
+    assert datetime_factory('2020-01-02T03:04:05Z') == dt.datetime(2020, 1, 2, 3, 4, 5,
+                                                                  tzinfo=utc)
+    # not ISO 8601, falls back to dateutil
+    assert datetime_factory('January 2, 2020 3:04 AM') == dt.datetime(2020, 1, 2, 3, 4)
+    # with a format hint (which dateutil would get wrong)
+    assert datetime_factory('02/01/2020', format='%d/%m/%Y') == dt.datetime(2020, 1, 2)
+    assert date_factory('02/01/2020', format='%d/%m/%Y') == dt.date(2020, 1, 2)
+
+    # repeated strings are memoized
+    hits = utils._parse_datetime.cache_info().hits
+    assert datetime_factory('2020-01-02') == dt.datetime(2020, 1, 2)
+    assert utils._parse_datetime.cache_info().hits == hits + 1
+
+
 def test_normalize_identifiers():
     assert normalize_identifiers(None) is None
     assert normalize_identifiers([]) == []
@@ -74,3 +99,74 @@ def test_normalize_identifiers():
         ]
         '''
     ) == [Identifier('Model', 'id1'), Identifier('Model', 'id2')]
+
+
+def test_normalize_identifiers_errors():
+    with pytest.raises(Exception) as e:
+        normalize_identifiers('no class name')
+    assert str(e.value) == "Identifier must have a class name. (got 'no class name')"
+
+    with pytest.raises(Exception) as e:
+        normalize_identifiers([Identifier('Model', 'id'), 1])
+    assert str(e.value) == "Unexpected type <class 'int'> (for 1)"
+
+
+def test_normalize_identifiers_bulk():
+    values = ['Model(id1, id2)', None, 'Model(id1, id2)', ['Model(id2)', 'Other(id3)']]
+    assert normalize_identifiers_bulk(values) == [
+        [Identifier('Model', 'id1'), Identifier('Model', 'id2')],
+        None,
+        [Identifier('Model', 'id1'), Identifier('Model', 'id2')],
+        [Identifier('Model', 'id2'), Identifier('Other', 'id3')],
+    ]
+
+    # the results can be modified without affecting the cached ones
+    normalize_identifiers_bulk(values)[0].clear()
+    assert normalize_identifiers('Model(id1, id2)') == \
+           [Identifier('Model', 'id1'), Identifier('Model', 'id2')]
+
+
+def test_topological_sort():
+    assert topological_sort({}) == []
+    assert topological_sort({'a': []}) == ['a']
+
+    order = topological_sort({'Article': ['User', 'Tag'], 'Tag': [], 'User': ['Group']})
+    assert set(order) == {'Article', 'Group', 'Tag', 'User'}
+    assert order.index('Group') < order.index('User') < order.index('Article')
+    assert order.index('Tag') < order.index('Article')
+
+
+def test_topological_levels():
+    assert topological_levels({}) == []
+    assert topological_levels({'Article': ['User', 'Tag'], 'Tag': [], 'User': ['Group']}) \
+        == [['Group', 'Tag'], ['User'], ['Article']]
+
+
+def test_topological_sort_cycles():
+    with pytest.raises(CircularDependencyError) as e:
+        topological_sort({'a': ['b'], 'b': ['c'], 'c': ['a']})
+    assert e.value.cycle == ['a', 'b', 'c', 'a']
+
+    with pytest.raises(CircularDependencyError) as e:
+        topological_sort({'a': ['a']})
+    assert e.value.cycle == ['a', 'a']
+
+
+def test_parse_model_names():
+    assert parse_model_names('Article, Tag ,,User') == ['Article', 'Tag', 'User']
+    assert parse_model_names(' , ') is None
+    assert parse_model_names(None) is None
+
+
+def test_save_and_load_pickle(tmp_path):
+    path = str(tmp_path / 'sub' / 'data.pickle')
+    assert load_pickle(path, 1) is None
+
+    save_pickle(path, 1, {'a': 1})
+    assert load_pickle(path, 1) == {'a': 1}
+    assert load_pickle(path, 2) is None  # an outdated format
+    assert [p.name for p in (tmp_path / 'sub').iterdir()] == ['data.pickle']
+
+    with open(path, 'wb') as f:
+        f.write(b'corrupt')
+    assert load_pickle(path, 1) is None